@@ -1,124 +1,11 @@
-import random
+import os
 import time
 import sys
 import copy
 
-# 2048 game engine (simplified version)
-class Game2048:
-    def __init__(self):
-        self.reset()
-        
-    def reset(self):
-        self.grid = [[0 for _ in range(4)] for _ in range(4)]
-        self.score = 0
-        self.add_tile()
-        self.add_tile()
-        
-    def add_tile(self):
-        empty_cells = [(i, j) for i in range(4) for j in range(4) if self.grid[i][j] == 0]
-        if empty_cells:
-            i, j = random.choice(empty_cells)
-            # In easy mode, we only get 2s
-            self.grid[i][j] = 2
-            
-    def move(self, direction):
-        # 0: up, 1: right, 2: down, 3: left
-        moved = False
-        
-        if direction == 0:  # Up
-            for j in range(4):
-                for i in range(1, 4):
-                    if self.grid[i][j] != 0:
-                        row = i
-                        while row > 0 and self.grid[row-1][j] == 0:
-                            self.grid[row-1][j] = self.grid[row][j]
-                            self.grid[row][j] = 0
-                            row -= 1
-                            moved = True
-                        if row > 0 and self.grid[row-1][j] == self.grid[row][j]:
-                            self.grid[row-1][j] *= 2
-                            self.score += self.grid[row-1][j]
-                            self.grid[row][j] = 0
-                            moved = True
-                            
-        elif direction == 1:  # Right
-            for i in range(4):
-                for j in range(2, -1, -1):
-                    if self.grid[i][j] != 0:
-                        col = j
-                        while col < 3 and self.grid[i][col+1] == 0:
-                            self.grid[i][col+1] = self.grid[i][col]
-                            self.grid[i][col] = 0
-                            col += 1
-                            moved = True
-                        if col < 3 and self.grid[i][col+1] == self.grid[i][col]:
-                            self.grid[i][col+1] *= 2
-                            self.score += self.grid[i][col+1]
-                            self.grid[i][col] = 0
-                            moved = True
-                            
-        elif direction == 2:  # Down
-            for j in range(4):
-                for i in range(2, -1, -1):
-                    if self.grid[i][j] != 0:
-                        row = i
-                        while row < 3 and self.grid[row+1][j] == 0:
-                            self.grid[row+1][j] = self.grid[row][j]
-                            self.grid[row][j] = 0
-                            row += 1
-                            moved = True
-                        if row < 3 and self.grid[row+1][j] == self.grid[row][j]:
-                            self.grid[row+1][j] *= 2
-                            self.score += self.grid[row+1][j]
-                            self.grid[row][j] = 0
-                            moved = True
-                            
-        elif direction == 3:  # Left
-            for i in range(4):
-                for j in range(1, 4):
-                    if self.grid[i][j] != 0:
-                        col = j
-                        while col > 0 and self.grid[i][col-1] == 0:
-                            self.grid[i][col-1] = self.grid[i][col]
-                            self.grid[i][col] = 0
-                            col -= 1
-                            moved = True
-                        if col > 0 and self.grid[i][col-1] == self.grid[i][col]:
-                            self.grid[i][col-1] *= 2
-                            self.score += self.grid[i][col-1]
-                            self.grid[i][col] = 0
-                            moved = True
-        
-        if moved:
-            self.add_tile()
-            
-        return moved
-    
-    def is_game_over(self):
-        # Check if there are any empty cells
-        for i in range(4):
-            for j in range(4):
-                if self.grid[i][j] == 0:
-                    return False
-                
-        # Check if there are any possible merges
-        for i in range(4):
-            for j in range(4):
-                if j < 3 and self.grid[i][j] == self.grid[i][j+1]:
-                    return False
-                if i < 3 and self.grid[i][j] == self.grid[i+1][j]:
-                    return False
-                    
-        return True
-    
-    def get_max_tile(self):
-        return max(max(row) for row in self.grid)
-    
-    def display(self):
-        print("Score:", self.score)
-        for row in self.grid:
-            print(" ".join(str(x).rjust(4) for x in row))
-        print()
+# The shared headless engine (same rules as terminal-engine.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from engine_2048 import Game2048
 
 # AI player using a corner strategy
 class AutoPlayer:
@@ -180,32 +67,41 @@ class AutoPlayer:
         
         return score
     
-    def play(self, target=16384, delay=0.1):
-        print(f"Starting auto-play to reach {target}...")
-        print("Strategy: Corner strategy (top-left) with snake pattern")
+    def play(self, target=16384, delay=0.1, max_moves=5000, verbose=True):
+        # Same signature as the players in improved_2048_ai.py, so it can be
+        # benchmarked alongside them; verbose=False keeps it quiet
+        log = print if verbose else lambda *args, **kwargs: None
+        log(f"Starting auto-play to reach {target}...")
+        log("Strategy: Corner strategy (top-left) with snake pattern")
         
-        while not self.game.is_game_over() and self.game.get_max_tile() < target:
+        while (not self.game.is_game_over() and
+               self.game.get_max_tile() < target and
+               self.moves < max_moves):
             move = self.get_best_move()
             self.game.move(move)
             self.moves += 1
             
             if self.moves % 50 == 0:
-                print(f"Moves: {self.moves}, Score: {self.game.score}, Max Tile: {self.game.get_max_tile()}")
-                self.game.display()
+                log(f"Moves: {self.moves}, Score: {self.game.score}, Max Tile: {self.game.get_max_tile()}")
+                if verbose:
+                    self.game.display()
                 
             time.sleep(delay)
             
-        print("\n" + "="*40)
-        print("Game Over!")
-        print(f"Total moves: {self.moves}")
-        print(f"Final score: {self.game.score}")
-        print(f"Max tile: {self.game.get_max_tile()}")
-        self.game.display()
+        log("\n" + "="*40)
+        log("Game Over!")
+        log(f"Total moves: {self.moves}")
+        log(f"Final score: {self.game.score}")
+        log(f"Max tile: {self.game.get_max_tile()}")
+        if verbose:
+            self.game.display()
         
         if self.game.get_max_tile() >= target:
-            print("🎉 Successfully reached the target!")
+            log("🎉 Successfully reached the target!")
         else:
-            print("❌ Failed to reach the target.")
+            log("❌ Failed to reach the target.")
+            
+        return self.game.get_max_tile() >= target
 
 # Main execution
 if __name__ == "__main__":
@@ -0,0 +1,209 @@
+import argparse
+import csv
+import json
+import os
+import time
+from collections import Counter
+from multiprocessing import Pool
+
+from bitboard_2048 import BitboardGame2048
+from improved_2048_ai import Game2048
+from ntuple_network import DEFAULT_WEIGHTS
+from opening_book import OpeningBook
+from players_2048 import PLAYERS, make_player
+from replay_2048 import ReplayRecorder
+
+# Parallel benchmark runner for the 2048 players.
+#
+# Every game gets its own seed, so a configuration can be re-run and games
+# are comparable between configurations. Games run quietly in a process
+# pool and only the aggregated report is printed (and optionally saved).
+#
+# Example:
+#   python benchmark_2048.py --player expectimax --games 40 --workers 8 \
+#       --bitboard --cache-size 200000 --json report.json --csv games.csv
+#
+# With --book the expectimax players share an on-disk opening book, so
+# every run adds the positions it searched to the book for the next one.
+
+GAME_CLASSES = {
+    'list': Game2048,
+    'bitboard': BitboardGame2048,
+}
+
+# Columns of the per-game CSV (the keys of play_game's result)
+GAME_FIELDS = ['seed', 'success', 'max_tile', 'score', 'moves', 'nodes', 'book_hits', 'seconds']
+
+
+def play_game(job):
+    # Runs in a worker process; job is a plain dict so it pickles cheaply
+    game = GAME_CLASSES[job['board']](seed=job['seed'], easy=job['easy'])
+    player_options = dict(job['player_options'])
+    if 'workers' in player_options:
+        # A pool worker can't start a pool of its own
+        raise ValueError("Players can't use workers in a benchmark; its games already run in parallel")
+    if player_options.get('stats_path'):
+        # Every game appends to the same JSON lines file, tagged by seed
+        player_options['stats_tags'] = {'seed': job['seed']}
+    player = make_player(job['player'], game, **player_options)
+    recorder = ReplayRecorder(game) if job['replay_dir'] else None
+
+    start = time.perf_counter()
+    success = player.play(target=job['target'], delay=0, max_moves=job['max_moves'], verbose=False)
+    seconds = time.perf_counter() - start
+    if recorder:
+        recorder.save(os.path.join(job['replay_dir'], f"seed_{job['seed']}.2048_replay"))
+
+    search_log = getattr(player, 'search_log', [])
+    return {
+        'seed': job['seed'],
+        'success': success,
+        'max_tile': game.get_max_tile(),
+        'score': game.score,
+        'moves': player.moves,
+        'nodes': sum(nodes for _, nodes, _ in search_log),
+        'book_hits': getattr(player, 'book_hits', 0),
+        'seconds': seconds,
+    }
+
+
+def run_benchmark(player='expectimax', num_games=10, seed=0, workers=None, target=16384,
+                  max_moves=10000, board='list', easy=False, replay_dir=None, **player_options):
+    if replay_dir:
+        os.makedirs(replay_dir, exist_ok=True)
+    jobs = [{
+        'seed': seed + i,
+        'player': player,
+        'board': board,
+        'easy': easy,
+        'target': target,
+        'max_moves': max_moves,
+        'replay_dir': replay_dir,
+        'player_options': player_options,
+    } for i in range(num_games)]
+
+    start = time.perf_counter()
+    with Pool(workers) as pool:
+        games = sorted(pool.imap_unordered(play_game, jobs), key=lambda g: g['seed'])
+    wall_seconds = time.perf_counter() - start
+
+    return {
+        'config': {
+            'player': player,
+            'board': board,
+            'easy': easy,
+            'games': num_games,
+            'seed': seed,
+            'workers': workers or os.cpu_count(),
+            'target': target,
+            'max_moves': max_moves,
+            'player_options': player_options,
+        },
+        'summary': summarize(games, wall_seconds),
+        'games': games,
+    }
+
+
+def summarize(games, wall_seconds):
+    total_moves = sum(g['moves'] for g in games)
+    total_nodes = sum(g['nodes'] for g in games)
+    # Per-core rates use the time spent inside games, not the pool's wall time
+    game_seconds = sum(g['seconds'] for g in games) or 1e-9
+    successes = sum(1 for g in games if g['success'])
+    histogram = Counter(g['max_tile'] for g in games)
+    return {
+        'success_rate': successes / len(games) if games else 0.0,
+        'successes': successes,
+        'max_tile_histogram': {str(tile): histogram[tile] for tile in sorted(histogram)},
+        'average_score': sum(g['score'] for g in games) / len(games) if games else 0.0,
+        'total_moves': total_moves,
+        'total_nodes': total_nodes,
+        'moves_per_sec': total_moves / game_seconds,
+        'nodes_per_sec': total_nodes / game_seconds,
+        'wall_seconds': wall_seconds,
+    }
+
+
+def print_report(report):
+    config = report['config']
+    summary = report['summary']
+    print(f"=== {config['player']} on {config['board']} board, "
+          f"{config['games']} games, {config['workers']} workers ===")
+    if config['player_options']:
+        print(f"Options: {config['player_options']}")
+    print(f"Success rate: {summary['successes']}/{config['games']} ({summary['success_rate']*100:.1f}%)")
+    print("Max tiles:")
+    for tile, count in summary['max_tile_histogram'].items():
+        print(f"  {tile.rjust(6)}: {count}")
+    print(f"Average score: {summary['average_score']:.0f}")
+    print(f"Moves/sec: {summary['moves_per_sec']:.1f}, Nodes/sec: {summary['nodes_per_sec']:.0f}")
+    print(f"Wall time: {summary['wall_seconds']:.1f} s")
+
+
+def write_csv(report, path):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=GAME_FIELDS)
+        writer.writeheader()
+        writer.writerows(report['games'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark 2048 players over many seeded games.")
+    parser.add_argument('--player', choices=sorted(PLAYERS), default='expectimax')
+    parser.add_argument('--games', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=0, help="seed of the first game")
+    parser.add_argument('--workers', type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument('--target', type=int, default=16384)
+    parser.add_argument('--max-moves', type=int, default=10000)
+    parser.add_argument('--bitboard', action='store_true', help="use BitboardGame2048")
+    parser.add_argument('--easy', action='store_true',
+                        help="easy-mode spawns (default: 2s, and 4s 10%% of the time)")
+    parser.add_argument('--depth', type=int, default=2)
+    parser.add_argument('--cache-size', type=int, default=0)
+    parser.add_argument('--time-budget-ms', type=float, default=None)
+    parser.add_argument('--evaluator', choices=['python', 'numpy', 'tables', 'ntuple'], default='python')
+    parser.add_argument('--ntuple-weights', default=DEFAULT_WEIGHTS, help="weights for --evaluator ntuple")
+    parser.add_argument('--prob-cutoff', type=float, default=0.0)
+    parser.add_argument('--spawn-samples', type=int, default=None)
+    parser.add_argument('--no-symmetry', action='store_true',
+                        help="don't share cache entries between mirrored boards")
+    parser.add_argument('--stats', help="append per-move search statistics to this JSON lines file")
+    parser.add_argument('--book', help="opening book file to use and fill (created if missing)")
+    parser.add_argument('--book-size', type=int, default=1 << 20, help="entries in a new book")
+    parser.add_argument('--json', help="write the full report to this JSON file")
+    parser.add_argument('--csv', help="write one row per game to this CSV file")
+    parser.add_argument('--replays', help="save every game's replay into this directory")
+    args = parser.parse_args()
+
+    player_options = {}
+    if args.player == 'expectimax':
+        player_options = {
+            'depth': args.depth,
+            'cache_size': args.cache_size,
+            'time_budget_ms': args.time_budget_ms,
+            'evaluator': args.evaluator,
+            'prob_cutoff': args.prob_cutoff,
+            'spawn_samples': args.spawn_samples,
+            'symmetry': not args.no_symmetry,
+            'ntuple_weights': args.ntuple_weights,
+            'stats_path': args.stats,
+        }
+        if args.book:
+            # Created up front so the workers don't race to create it
+            if not os.path.exists(args.book):
+                OpeningBook.create(args.book, args.book_size)
+            player_options['book'] = args.book
+
+    report = run_benchmark(args.player, args.games, args.seed, args.workers, args.target,
+                           args.max_moves, 'bitboard' if args.bitboard else 'list',
+                           args.easy, args.replays, **player_options)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.csv:
+        write_csv(report, args.csv)
+
+
+if __name__ == "__main__":
+    main()
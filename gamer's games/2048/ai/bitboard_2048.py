@@ -0,0 +1,200 @@
+import os
+import sys
+import numpy as np
+
+# The shared engine lives next to terminal-engine.py
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import engine_2048
+
+# 2048 game engine (bitboard version)
+#
+# The 4x4 grid is packed into one 64-bit integer: every cell holds the log2
+# of its tile in a 4-bit nibble (0 = empty, 1 = 2, 2 = 4, ... 15 = 32768).
+# Cell (i, j) lives at nibble 4*i + j, so row i is (board >> 16*i) & 0xFFFF
+# with column 0 in the lowest nibble.
+#
+# A row only has 65536 possible values, so sliding a row left or right is
+# precomputed once into lookup tables together with the score it earns.
+# Up and down moves transpose the board and reuse the row tables.
+
+ROW_MASK = 0xFFFF
+MAX_EXPONENT = 15
+NIBBLE_SHIFTS = np.arange(0, 64, 4, dtype=np.uint64)
+
+
+def _slide_row_left(exps):
+    # Same rules as engine_2048.compress_and_merge: compress the
+    # non-empty tiles, then merge each equal pair once from the left.
+    # Two 32768 tiles can't merge because 65536 doesn't fit in a nibble.
+    tiles = [e for e in exps if e != 0]
+    result = []
+    gained = 0
+    i = 0
+    while i < len(tiles):
+        if i + 1 < len(tiles) and tiles[i] == tiles[i + 1] and tiles[i] < MAX_EXPONENT:
+            result.append(tiles[i] + 1)
+            gained += 2 ** (tiles[i] + 1)
+            i += 2
+        else:
+            result.append(tiles[i])
+            i += 1
+    return result + [0] * (4 - len(result)), gained
+
+
+def _pack_row(exps):
+    return exps[0] | (exps[1] << 4) | (exps[2] << 8) | (exps[3] << 12)
+
+
+def _unpack_row(row):
+    return [row & 0xF, (row >> 4) & 0xF, (row >> 8) & 0xF, (row >> 12) & 0xF]
+
+
+def _build_tables():
+    left = [0] * 65536
+    right = [0] * 65536
+    score_left = [0] * 65536
+    score_right = [0] * 65536
+    for row in range(65536):
+        exps = _unpack_row(row)
+        result, gained = _slide_row_left(exps)
+        left[row] = _pack_row(result)
+        score_left[row] = gained
+        result, gained = _slide_row_left(exps[::-1])
+        right[row] = _pack_row(result[::-1])
+        score_right[row] = gained
+    return left, right, score_left, score_right
+
+
+ROW_LEFT, ROW_RIGHT, SCORE_LEFT, SCORE_RIGHT = _build_tables()
+
+
+def transpose(board):
+    # Swap nibble 4*i + j with nibble 4*j + i in a handful of mask/shift steps
+    a1 = board & 0xF0F00F0FF0F00F0F
+    a2 = board & 0x0000F0F00000F0F0
+    a3 = board & 0x0F0F00000F0F0000
+    a = a1 | (a2 << 12) | (a3 >> 12)
+    b1 = a & 0xFF00FF0000FF00FF
+    b2 = a & 0x00FF00FF00000000
+    b3 = a & 0x00000000FF00FF00
+    return b1 | (b2 >> 24) | (b3 << 24)
+
+
+def _slide_rows(board, row_table, score_table):
+    r0 = board & ROW_MASK
+    r1 = (board >> 16) & ROW_MASK
+    r2 = (board >> 32) & ROW_MASK
+    r3 = (board >> 48) & ROW_MASK
+    new_board = (row_table[r0] | (row_table[r1] << 16) |
+                 (row_table[r2] << 32) | (row_table[r3] << 48))
+    gained = score_table[r0] + score_table[r1] + score_table[r2] + score_table[r3]
+    return new_board, gained
+
+
+def slide(board, direction):
+    # 0: up, 1: right, 2: down, 3: left (same numbering as Game2048.move)
+    # Returns the new board and the score gained; no tile is spawned.
+    if direction == 3:
+        return _slide_rows(board, ROW_LEFT, SCORE_LEFT)
+    if direction == 1:
+        return _slide_rows(board, ROW_RIGHT, SCORE_RIGHT)
+    # Columns become rows after a transpose, so up is left and down is right
+    if direction == 0:
+        new_board, gained = _slide_rows(transpose(board), ROW_LEFT, SCORE_LEFT)
+    else:
+        new_board, gained = _slide_rows(transpose(board), ROW_RIGHT, SCORE_RIGHT)
+    return transpose(new_board), gained
+
+
+def empty_positions(board):
+    return [n for n in range(16) if (board >> (4 * n)) & 0xF == 0]
+
+
+def board_from_grid(grid):
+    # Tiles above 32768 don't fit in a nibble and are stored as 32768
+    board = 0
+    for i in range(4):
+        for j in range(4):
+            if grid[i][j]:
+                exponent = min(grid[i][j].bit_length() - 1, MAX_EXPONENT)
+                board |= exponent << (4 * (4 * i + j))
+    return board
+
+
+def grid_from_board(board):
+    return [[1 << e if e else 0 for e in _unpack_row((board >> (16 * i)) & ROW_MASK)]
+            for i in range(4)]
+
+
+def board_game_over(board):
+    if empty_positions(board):
+        return False
+    # On a full board left/right (and up/down) are blocked together, so
+    # checking one horizontal and one vertical slide is enough
+    return slide(board, 3)[0] == board and slide(board, 0)[0] == board
+
+
+# Same rules and surface as the shared engine's Game2048; only the board
+# representation changes, so the search works on plain integers through the
+# static *_board helpers.
+class BitboardGame2048(engine_2048.Game2048):
+    @staticmethod
+    def empty_board(rows, cols):
+        if (rows, cols) != (4, 4):
+            raise ValueError("bitboards are 4x4 only")
+        return 0
+
+    slide_board = staticmethod(slide)
+    board_game_over = staticmethod(board_game_over)
+    board_grid = staticmethod(grid_from_board)
+    board_bits = staticmethod(lambda board: board)
+
+    @property
+    def grid(self):
+        # Nested-list view of the board, built on demand
+        return grid_from_board(self.board)
+
+    def state(self):
+        return self.board
+
+    def set_state(self, board):
+        self.board = board
+
+    @staticmethod
+    def boards_array(boards):
+        # (N, 4, 4) array of tile values for the batch evaluator
+        exponents = (np.array(boards, dtype=np.uint64)[:, None] >> NIBBLE_SHIFTS) & np.uint64(0xF)
+        exponents = exponents.astype(np.int64)
+        return np.where(exponents > 0, np.left_shift(1, exponents), 0).reshape(-1, 4, 4)
+
+    @staticmethod
+    def board_empty_cells(board):
+        return [divmod(n, 4) for n in empty_positions(board)]
+
+    @staticmethod
+    def board_tiles(board):
+        tiles = []
+        while board:
+            if board & 0xF:
+                tiles.append(1 << (board & 0xF))
+            board >>= 4
+        return tiles
+
+    @staticmethod
+    def place_tile(board, i, j, value):
+        # Only used on empty cells, so the exponent can simply be OR-ed in
+        return board | ((value.bit_length() - 1) << (4 * (4 * i + j)))
+
+    def spawn_range(self, board=None):
+        # Nibbles top out at 32768, so easy-mode spawns are capped at 16384
+        low, high = super().spawn_range(board)
+        high = min(high, 1 << (MAX_EXPONENT - 1))
+        return min(low, high), high
+
+    def get_max_tile(self):
+        board = self.board
+        best = 0
+        while board:
+            best = max(best, board & 0xF)
+            board >>= 4
+        return 1 << best if best else 0
@@ -0,0 +1,86 @@
+import os
+import numpy as np
+
+from bitboard_2048 import ROW_MASK, transpose
+from engine_2048 import atomic_write
+
+# Per-row lookup tables for AutoPlayer.evaluate_board.
+#
+# Empty cells, monotonicity and smoothness only ever look at one row or one
+# column at a time, so each of them is precomputed for all 65536 possible
+# rows (4 nibbles of log2 values, as in bitboard_2048). The three integer
+# terms are packed into one number so that a row's contribution is a single
+# lookup and the packed numbers can simply be added up:
+#   bits  0-23  smoothness penalty (sum of |a - b| over neighbouring tiles)
+#   bits 24-31  monotonicity count
+#   bits 32-39  empty cells (row table only, columns would count them twice)
+# A third table holds each row's largest exponent for the corner bonus.
+#
+# The tables are written to CACHE_DIR the first time and loaded from there
+# on later runs instead of being rebuilt.
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "2048-ai")
+TABLE_FILE = "heuristic_tables_v2.npy"
+
+SMOOTH_MASK = 0xFFFFFF
+MONO_SHIFT = 24
+EMPTY_SHIFT = 32
+
+
+def build_tables():
+    rows = np.arange(65536, dtype=np.int64)
+    exponents = np.stack([(rows >> (4 * k)) & 0xF for k in range(4)], axis=1)
+    values = np.where(exponents > 0, np.left_shift(1, exponents), 0)
+
+    empty = (exponents == 0).sum(axis=1)
+    left, right = values[:, :-1], values[:, 1:]
+    monotonicity = (left >= right).sum(axis=1) + (right >= left).sum(axis=1)
+    smoothness = np.where((left != 0) & (right != 0), np.abs(left - right), 0).sum(axis=1)
+
+    line = smoothness | (monotonicity << MONO_SHIFT)
+    return np.stack([line | (empty << EMPTY_SHIFT), line, exponents.max(axis=1)])
+
+
+def load_tables(cache_dir=CACHE_DIR):
+    path = os.path.join(cache_dir, TABLE_FILE)
+    if not os.path.exists(path):
+        os.makedirs(cache_dir, exist_ok=True)
+        atomic_write(path, lambda f: np.save(f, build_tables()))
+    return np.load(path)
+
+
+class HeuristicTables:
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.tables = load_tables(cache_dir)
+        # Plain lists for the scalar path: indexing a list from Python is much
+        # cheaper than pulling single elements out of an array
+        self.row_table, self.col_table, self.max_table = (t.tolist() for t in self.tables)
+
+    def evaluate(self, board):
+        # Same value as AutoPlayer.evaluate_board on the decoded board
+        row_table = self.row_table
+        col_table = self.col_table
+        columns = transpose(board)
+        r0 = board & ROW_MASK
+        r1 = (board >> 16) & ROW_MASK
+        r2 = (board >> 32) & ROW_MASK
+        r3 = board >> 48
+        packed = (row_table[r0] + row_table[r1] + row_table[r2] + row_table[r3] +
+                  col_table[columns & ROW_MASK] + col_table[(columns >> 16) & ROW_MASK] +
+                  col_table[(columns >> 32) & ROW_MASK] + col_table[columns >> 48])
+
+        empty_cells = packed >> EMPTY_SHIFT
+        monotonicity = (packed >> MONO_SHIFT) & 0xFF
+        smoothness = -(packed & SMOOTH_MASK)
+        return (empty_cells * 20 +
+                monotonicity * 1.5 +
+                smoothness * 0.1 +
+                self.corner_bonus(r0, r1, r2, r3))
+
+    def corner_bonus(self, r0, r1, r2, r3):
+        # Bonus when any corner holds the largest tile
+        max_table = self.max_table
+        exponent = max(max_table[r0], max_table[r1], max_table[r2], max_table[r3])
+        if exponent and exponent in (r0 & 0xF, r0 >> 12, r3 & 0xF, r3 >> 12):
+            return (1 << exponent) * 10
+        return 0
@@ -1,189 +1,419 @@
+import math
+import os
 import random
 import time
 import sys
-import copy
+from multiprocessing import Pool
 import numpy as np
 
-# 2048 game engine (improved version)
-class Game2048:
-    def __init__(self):
-        self.reset()
-        
-    def reset(self):
-        self.grid = [[0 for _ in range(4)] for _ in range(4)]
-        self.score = 0
-        self.add_tile()
-        self.add_tile()
-        
-    def add_tile(self):
-        empty_cells = [(i, j) for i in range(4) for j in range(4) if self.grid[i][j] == 0]
-        if empty_cells:
-            i, j = random.choice(empty_cells)
-            # In easy mode, we only get 2s
-            self.grid[i][j] = 2
-            
-    def move(self, direction):
-        # 0: up, 1: right, 2: down, 3: left
-        moved = False
-        original_grid = copy.deepcopy(self.grid)
-        
-        if direction == 0:  # Up
-            for j in range(4):
-                for i in range(1, 4):
-                    if self.grid[i][j] != 0:
-                        row = i
-                        while row > 0 and self.grid[row-1][j] == 0:
-                            self.grid[row-1][j] = self.grid[row][j]
-                            self.grid[row][j] = 0
-                            row -= 1
-                            moved = True
-                        if row > 0 and self.grid[row-1][j] == self.grid[row][j]:
-                            self.grid[row-1][j] *= 2
-                            self.score += self.grid[row-1][j]
-                            self.grid[row][j] = 0
-                            moved = True
-                            
-        elif direction == 1:  # Right
-            for i in range(4):
-                for j in range(2, -1, -1):
-                    if self.grid[i][j] != 0:
-                        col = j
-                        while col < 3 and self.grid[i][col+1] == 0:
-                            self.grid[i][col+1] = self.grid[i][col]
-                            self.grid[i][col] = 0
-                            col += 1
-                            moved = True
-                        if col < 3 and self.grid[i][col+1] == self.grid[i][col]:
-                            self.grid[i][col+1] *= 2
-                            self.score += self.grid[i][col+1]
-                            self.grid[i][col] = 0
-                            moved = True
-                            
-        elif direction == 2:  # Down
-            for j in range(4):
-                for i in range(2, -1, -1):
-                    if self.grid[i][j] != 0:
-                        row = i
-                        while row < 3 and self.grid[row+1][j] == 0:
-                            self.grid[row+1][j] = self.grid[row][j]
-                            self.grid[row][j] = 0
-                            row += 1
-                            moved = True
-                        if row < 3 and self.grid[row+1][j] == self.grid[row][j]:
-                            self.grid[row+1][j] *= 2
-                            self.score += self.grid[row+1][j]
-                            self.grid[row][j] = 0
-                            moved = True
-                            
-        elif direction == 3:  # Left
-            for i in range(4):
-                for j in range(1, 4):
-                    if self.grid[i][j] != 0:
-                        col = j
-                        while col > 0 and self.grid[i][col-1] == 0:
-                            self.grid[i][col-1] = self.grid[i][col]
-                            self.grid[i][col] = 0
-                            col -= 1
-                            moved = True
-                        if col > 0 and self.grid[i][col-1] == self.grid[i][col]:
-                            self.grid[i][col-1] *= 2
-                            self.score += self.grid[i][col-1]
-                            self.grid[i][col] = 0
-                            moved = True
-        
-        if moved:
-            self.add_tile()
-        else:
-            # If no move happened, restore the original grid
-            self.grid = original_grid
-            
-        return moved
-    
-    def is_game_over(self):
-        # Check if there are any empty cells
-        for i in range(4):
-            for j in range(4):
-                if self.grid[i][j] == 0:
-                    return False
-                
-        # Check if there are any possible merges
-        for i in range(4):
-            for j in range(4):
-                if j < 3 and self.grid[i][j] == self.grid[i][j+1]:
-                    return False
-                if i < 3 and self.grid[i][j] == self.grid[i+1][j]:
-                    return False
-                    
-        return True
-    
-    def get_max_tile(self):
-        return max(max(row) for row in self.grid)
+# The shared engine lives next to terminal-engine.py
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import engine_2048
+from replay_2048 import ReplayRecorder
+from bitboard_2048 import BitboardGame2048, board_from_grid
+from heuristic_tables import HeuristicTables
+from ntuple_network import DEFAULT_WEIGHTS, NTupleNetwork
+from opening_book import OpeningBook
+from search_stats import SearchStats
+from symmetry_2048 import canonical_board, canonical_grid
+from transposition_table import TranspositionTable
+
+# The AI plays on the shared headless engine (same rules as the TUI); this
+# subclass only adds the conversions the batch and table evaluators need
+class Game2048(engine_2048.Game2048):
+    @staticmethod
+    def boards_array(boards):
+        # (N, 4, 4) array of tile values for the batch evaluator
+        return np.array(boards, dtype=np.int64).reshape(-1, 4, 4)
     
-    def display(self):
-        print("Score:", self.score)
-        for row in self.grid:
-            print(" ".join(str(x).rjust(5) for x in row))
-        print()
+    @staticmethod
+    def board_bits(board):
+        # Packed 64-bit form for the heuristic lookup tables
+        return board_from_grid(board)
+
+# Raised inside the search when the per-move time budget runs out
+class SearchTimeout(Exception):
+    pass
 
 # Improved AI player using expectimax algorithm
 class AutoPlayer:
-    def __init__(self, game):
+    # How often (in nodes) the search looks at the clock in time-budget mode
+    TIME_CHECK_INTERVAL = 256
+    
+    def __init__(self, game, depth=2, cache_size=0, cache_policy='lru',
+                 time_budget_ms=None, max_depth=12, workers=None, evaluator='python',
+                 prob_cutoff=0.0, spawn_samples=None, sample_seed=0, four_probability=None,
+                 book=None, book_min_depth=None, symmetry=True, ntuple_weights=DEFAULT_WEIGHTS,
+                 instrument=False, stats_path=None, stats_tags=None):
         self.game = game
         self.moves = 0
+        self.depth = depth
+        # Transposition table shared across moves (disabled when cache_size is 0)
+        self.cache = TranspositionTable(cache_size, cache_policy) if cache_size else None
+        # Mirrored and rotated boards have the same value, so with symmetry
+        # on they share one cache entry: the canonical board's, which is
+        # the one searched (see search_board)
+        self.symmetry = symmetry
+        self.canonical = canonical_board if isinstance(game.EMPTY_BOARD, int) else canonical_grid
+        # Chance model: the game's own spawn rules, unless four_probability
+        # forces the plain 2/4 split
+        self.four_probability = four_probability
+        # Nodes reached with a cumulative probability below prob_cutoff are
+        # scored statically instead of being expanded
+        self.prob_cutoff = prob_cutoff
+        # Every chance level below a node divides its path probability by
+        # at most 2^chance_level_bits (see prob_bucket)
+        self.chance_level_bits = math.ceil(-math.log2(self.min_outcome_probability()))
+        # With spawn_samples = K, chance nodes look at K spawn cells picked
+        # by a generator seeded from the board (so repeat searches agree)
+        self.spawn_samples = spawn_samples
+        self.sample_seed = sample_seed
+        # Settings the worker processes need to rebuild an identical searcher
+        self.game_options = {'easy': game.easy, 'unlimited': game.unlimited}
+        self.search_options = {'cache_size': cache_size, 'cache_policy': cache_policy,
+                               'evaluator': evaluator, 'prob_cutoff': prob_cutoff,
+                               'spawn_samples': spawn_samples, 'sample_seed': sample_seed,
+                               'four_probability': four_probability, 'symmetry': symmetry,
+                               'ntuple_weights': ntuple_weights}
+        # 'python' scores every leaf with evaluate_board; 'numpy' collects the
+        # leaves below each depth-1 node and scores them with evaluate_boards;
+        # 'tables' scores leaves with the precomputed per-row lookup tables;
+        # 'ntuple' uses the trained network in ntuple_weights (see
+        # train_ntuple.py)
+        if evaluator not in ('python', 'numpy', 'tables', 'ntuple'):
+            raise ValueError(f"Unknown evaluator: {evaluator}")
+        self.evaluator = evaluator
+        self.tables = HeuristicTables() if evaluator == 'tables' else None
+        # The network predicts the score still to come after a slide, so
+        # with it the search adds up the merge scores along each path and
+        # always ends on an afterstate
+        self.network = NTupleNetwork(ntuple_weights) if evaluator == 'ntuple' else None
+        # Root-parallel search: chance subtrees below the root moves are
+        # farmed out to a persistent process pool (None = serial)
+        self.workers = workers
+        self.pool = None
+        # Iterative deepening: with a budget, depth grows until time runs out
+        self.time_budget_ms = time_budget_ms
+        self.max_depth = max_depth
+        self.deadline = None
+        self.nodes = 0
+        # Node count at which the clock is looked at next (batched leaves
+        # add several nodes at once, so a multiple could be skipped)
+        self.next_check = 0
+        # (depth reached, nodes searched, milliseconds) for every move played
+        self.search_log = []
+        # Opening book (an OpeningBook or the path of its file): moves found
+        # by earlier searches, reused if they were searched at least
+        # book_min_depth deep (default: depth). Only valid for one set of
+        # search options, so keep one book per configuration.
+        if isinstance(book, str):
+            book = OpeningBook(book)
+        self.book = book
+        self.book_min_depth = depth if book_min_depth is None else book_min_depth
+        self.book_hits = 0
+        # Instrumentation (see search_stats.py), off by default. When on, the
+        # node counting wrapper shadows _expectimax on this instance only, so
+        # an uninstrumented search runs exactly the same code as before.
+        # stats_path streams the per-move records there as JSON lines.
+        self.stats = None
+        if instrument or stats_path:
+            self.stats = SearchStats(stats_path, stats_tags)
+            self._expectimax = self._counted_expectimax
         
     def get_best_move(self):
+        start = time.perf_counter()
+        self.nodes = 0
+        board = self.game.state()
+        if self.stats is not None and self.cache is not None:
+            cache_counts = (self.cache.hits, self.cache.misses)
+        
+        book_board = self.book_board(board)
+        if book_board is not None:
+            best_move = self.book.get(book_board, self.book_min_depth)
+            if best_move is not None and self.game.slide_board(board, best_move)[0] != board:
+                self.book_hits += 1
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                self.search_log.append((0, 0, elapsed_ms))
+                if self.stats is not None:
+                    self.stats.end_move(0, 0, elapsed_ms, book=True)
+                return best_move
+        
+        if self.time_budget_ms is None:
+            depth = self.depth
+            best_move = self.search_root(board, depth)
+        else:
+            depth, best_move = self.iterative_deepening(board, start)
+            
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.search_log.append((depth, self.nodes, elapsed_ms))
+        if self.stats is not None:
+            cache_hits = cache_misses = 0
+            if self.cache is not None:
+                cache_hits = self.cache.hits - cache_counts[0]
+                cache_misses = self.cache.misses - cache_counts[1]
+            self.stats.end_move(depth, self.nodes, elapsed_ms, cache_hits, cache_misses)
+        if book_board is not None:
+            self.book.put(book_board, best_move, depth)
+        return best_move
+    
+    def book_board(self, board):
+        # The book is keyed by bitboard, which only holds tiles up to 32768
+        if self.book is None or max(self.game.board_tiles(board), default=0) > 32768:
+            return None
+        return self.game.board_bits(board)
+    
+    def search_root(self, board, depth):
         best_score = -float('inf')
         best_move = 0
         
         # Try each possible move
+        children = []
         for move in range(4):
-            game_copy = copy.deepcopy(self.game)
-            moved = game_copy.move(move)
-            
-            if not moved:
-                continue
+            child, gained = self.game.slide_board(board, move)
+            if child != board:
+                children.append((move, child, gained))
                 
-            # Evaluate the board after this move
-            score = self.expectimax(game_copy, 2, False)
+        # Evaluate the board after each move
+        spawn_range = self.chance_range(board)
+        if self.workers and depth > 0:
+            scores = self.parallel_scores([child for _, child, _ in children], depth, spawn_range)
+        else:
+            scores = [self.expectimax(child, depth, False, spawn_range=spawn_range)
+                      for _, child, _ in children]
             
+        for (move, _, gained), score in zip(children, scores):
+            if self.network is not None:
+                score += gained
             if score > best_score:
                 best_score = score
                 best_move = move
                 
         return best_move
     
-    def expectimax(self, game_state, depth, is_max_turn):
-        if depth == 0 or game_state.is_game_over():
-            return self.evaluate_board(game_state.grid)
+    def parallel_scores(self, children, depth, spawn_range=None):
+        # Every (root move, spawn) pair becomes one task. The results come
+        # back in task order and are combined exactly like the serial chance
+        # node does, so the chosen move matches the serial search.
+        if self.pool is None:
+            self.pool = Pool(self.workers, initializer=_init_search_worker,
+                             initargs=(type(self.game), self.game_options, self.search_options))
+        # perf_counter isn't shared between processes, so the deadline is
+        # shipped as wall-clock time
+        deadline = None
+        if self.deadline is not None:
+            deadline = time.time() + (self.deadline - time.perf_counter())
+        # Split the same boards the serial expectimax would search
+        outcomes = [self.chance_outcomes(self.search_board(child), spawn_range) for child in children]
+        tasks = [(grandchild, depth - 1, probability, deadline)
+                 for outcome in outcomes for grandchild, probability in outcome]
+        results = iter(self.pool.map(_search_subtree, tasks))
+        
+        scores = []
+        for outcome in outcomes:
+            self.nodes += 1
+            total_score = 0
+            for _, probability in outcome:
+                score, nodes = next(results)
+                if score is None:
+                    raise SearchTimeout()
+                self.nodes += nodes
+                total_score += probability * score
+            scores.append(total_score)
+        return scores
+    
+    def close(self):
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool = None
+    
+    def iterative_deepening(self, board, start):
+        # Depth 1 always runs to completion so there is a move to play
+        best_move = self.search_root(board, 1)
+        depth = 1
+        
+        self.deadline = start + self.time_budget_ms / 1000
+        self.next_check = self.nodes + self.TIME_CHECK_INTERVAL
+        try:
+            while depth < self.max_depth:
+                best_move = self.search_root(board, depth + 1)
+                depth += 1
+        except SearchTimeout:
+            # The unfinished iteration is discarded; subtrees it completed
+            # are still in the transposition table for the next move
+            pass
+        finally:
+            self.deadline = None
+            
+        return depth, best_move
+    
+    def expectimax(self, board, depth, is_max_turn, prob=1.0, spawn_range=None):
+        # spawn_range: at chance nodes, the easy-mode range the game fixed
+        # before the slide (see chance_range)
+        if self.cache is None or depth == 0:
+            # Leaves are cheaper to evaluate than to look up
+            return self._expectimax(board, depth, is_max_turn, prob, spawn_range)
+        # The same board is reached through different move and spawn orders.
+        # With a cutoff the value also depends on how likely the path was.
+        board = self.search_board(board)
+        if self.prob_cutoff:
+            key = (board, depth, is_max_turn, spawn_range, self.prob_bucket(prob, depth, is_max_turn))
+        else:
+            key = (board, depth, is_max_turn, spawn_range)
+        score = self.cache.get(key)
+        if score is None:
+            score = self._expectimax(board, depth, is_max_turn, prob, spawn_range)
+            self.cache.put(key, score)
+        return score
+    
+    def search_board(self, board):
+        # With symmetry on, the canonical board is searched in place of any
+        # of its mirrored or rotated forms. Searching the form that happened
+        # to be reached would add the same chance terms in another order
+        # (and sample other spawn cells), so a shared entry would differ
+        # from a fresh search in the last bits and could flip a close move.
+        if self.symmetry and self.cache is not None:
+            return self.canonical(board)
+        return board
+    
+    def prob_bucket(self, prob, depth, is_max_turn):
+        # Cache key part for the path probability: its power of two above
+        # the cutoff, so paths of about the same probability share entries.
+        # Past the point where no node below can drop under the cutoff the
+        # value no longer depends on prob, so those all share one bucket.
+        if prob < self.prob_cutoff:
+            return -1
+        chance_levels = (depth + (0 if is_max_turn else 1)) // 2
+        return min(int(math.log2(prob / self.prob_cutoff)), chance_levels * self.chance_level_bits)
+    
+    def min_outcome_probability(self):
+        # Smallest probability chance_outcomes gives a spawn: a cell (there
+        # are at most rows * cols to pick from) times the least likely value
+        cells = self.game.rows * self.game.cols
+        if self.four_probability is not None:
+            value_probability = min(p for p in (self.four_probability, 1 - self.four_probability) if p > 0)
+        elif self.game.easy:
+            # The range runs from 2 up to half the largest tile, which
+            # is at most 2^(cells + 1): one value per cell at most
+            value_probability = 1 / cells
+        else:
+            value_probability = min(p for _, p in self.game.spawn_outcomes(self.game.EMPTY_BOARD))
+        return value_probability / cells
+    
+    def _counted_expectimax(self, board, depth, is_max_turn, prob=1.0, spawn_range=None):
+        self.stats.count_node(depth, is_max_turn)
+        return AutoPlayer._expectimax(self, board, depth, is_max_turn, prob, spawn_range)
+    
+    def _expectimax(self, board, depth, is_max_turn, prob=1.0, spawn_range=None):
+        # Boards are immutable values from the game's *_board helpers, so
+        # children are built directly instead of deep-copying the game
+        game = self.game
+        self.nodes += 1
+        if self.deadline is not None and self.nodes >= self.next_check:
+            self.next_check = self.nodes + self.TIME_CHECK_INTERVAL
+            if time.perf_counter() > self.deadline:
+                raise SearchTimeout()
+        if depth == 0 or prob < self.prob_cutoff or game.board_game_over(board):
+            if self.network is not None:
+                return self.network_score(board, is_max_turn)
+            if self.tables is not None:
+                return self.tables.evaluate(game.board_bits(board))
+            return self.evaluate_board(game.board_grid(board))
+        if depth == 1 and self.evaluator == 'numpy':
+            return self.batch_leaf_score(board, is_max_turn, spawn_range)
             
         if is_max_turn:
             # Player's turn - try all moves
             best_score = -float('inf')
+            child_range = self.chance_range(board)
             
             for move in range(4):
-                game_copy = copy.deepcopy(game_state)
-                moved = game_copy.move(move)
+                child, gained = game.slide_board(board, move)
                 
-                if not moved:
+                if child == board:
                     continue
                     
-                score = self.expectimax(game_copy, depth - 1, False)
+                score = self.expectimax(child, depth - 1, False, prob, child_range)
+                if self.network is not None:
+                    score += gained
                 best_score = max(best_score, score)
                 
             return best_score
         else:
             # Chance node - consider all possible tile placements
-            empty_cells = [(i, j) for i in range(4) for j in range(4) if game_state.grid[i][j] == 0]
             total_score = 0
             
-            for i, j in empty_cells:
-                # Try placing a 2 (only possibility in easy mode)
-                game_copy = copy.deepcopy(game_state)
-                game_copy.grid[i][j] = 2
-                score = self.expectimax(game_copy, depth - 1, True)
-                total_score += score
+            for child, probability in self.chance_outcomes(board, spawn_range):
+                score = self.expectimax(child, depth - 1, True, prob * probability)
+                total_score += probability * score
                 
-            return total_score / len(empty_cells) if empty_cells else 0
+            return total_score
+    
+    def network_score(self, board, is_max_turn):
+        # Chance nodes are afterstates and are scored directly; on the
+        # player's turn the best slide is played out first (0 if none is left)
+        game = self.game
+        if not is_max_turn:
+            return self.network.evaluate(game.board_bits(board))
+        scores = [gained + self.network.evaluate(game.board_bits(child))
+                  for child, gained in (game.slide_board(board, move) for move in range(4))
+                  if child != board]
+        return max(scores, default=0)
+    
+    def batch_leaf_score(self, board, is_max_turn, spawn_range=None):
+        # All children of a depth-1 node are leaves: score them in one pass
+        game = self.game
+        if is_max_turn:
+            children = []
+            for move in range(4):
+                child, _ = game.slide_board(board, move)
+                if child != board:
+                    children.append(child)
+            self.nodes += len(children)
+            if self.stats is not None:
+                self.stats.count_node(0, False, len(children))
+            return max(self.evaluate_boards(game.boards_array(children)))
+        
+        outcomes = self.chance_outcomes(board, spawn_range)
+        if not outcomes:
+            return 0
+        self.nodes += len(outcomes)
+        if self.stats is not None:
+            self.stats.count_node(0, True, len(outcomes))
+        scores = self.evaluate_boards(game.boards_array([child for child, _ in outcomes]))
+        total_score = 0
+        for (_, probability), score in zip(outcomes, scores.tolist()):
+            total_score += probability * score
+        return total_score
+    
+    def chance_range(self, board):
+        # Easy-mode spawns come from the range of the board before the
+        # slide (Game2048.move), so max nodes hand it to their chance nodes;
+        # None when the chance model doesn't depend on it
+        if self.four_probability is None and self.game.easy:
+            return self.game.spawn_range(board)
+        return None
+    
+    def chance_outcomes(self, board, spawn_range=None):
+        # (child board, probability) for every tile the game could spawn
+        game = self.game
+        empty_cells = game.board_empty_cells(board)
+        if not empty_cells:
+            return []
+        if self.spawn_samples and len(empty_cells) > self.spawn_samples:
+            rng = random.Random(hash((self.sample_seed, board)))
+            empty_cells = rng.sample(empty_cells, self.spawn_samples)
+        cell_probability = 1 / len(empty_cells)
+        if self.four_probability is None:
+            values = game.spawn_outcomes(board, spawn_range)
+        else:
+            values = [(2, 1 - self.four_probability), (4, self.four_probability)]
+        
+        outcomes = []
+        for i, j in empty_cells:
+            for value, value_probability in values:
+                if value_probability:
+                    outcomes.append((game.place_tile(board, i, j, value), cell_probability * value_probability))
+        return outcomes
     
     def evaluate_board(self, grid):
         # Multiple evaluation heuristics
@@ -197,17 +427,12 @@ class AutoPlayer:
         # 3. Smoothness - adjacent tiles should have similar values
         smoothness = self.smoothness_score(grid)
         
-        # 4. Maximum value position (prefer in corner)
-        max_value = 0
-        max_pos = (0, 0)
-        for i in range(4):
-            for j in range(4):
-                if grid[i][j] > max_value:
-                    max_value = grid[i][j]
-                    max_pos = (i, j)
+        # 4. Maximum value position (prefer in corner). Any corner holding
+        # the largest tile counts, so mirrored boards score the same
+        max_value = max(max(row) for row in grid)
         
         corner_bonus = 0
-        if max_pos in [(0, 0), (0, 3), (3, 0), (3, 3)]:
+        if max_value in (grid[0][0], grid[0][3], grid[3][0], grid[3][3]):
             corner_bonus = max_value * 10
         
         # Weighted combination of heuristics
@@ -216,6 +441,33 @@ class AutoPlayer:
                 smoothness * 0.1 + 
                 corner_bonus)
     
+    def evaluate_boards(self, boards):
+        # Vectorized evaluate_board for an (N, 4, 4) array of tile values;
+        # returns the N scores (same weights, same results)
+        empty_cells = (boards == 0).sum(axis=(1, 2))
+        
+        # Monotonicity: every adjacent pair is counted once per direction
+        monotonicity = ((boards[:, :, :-1] >= boards[:, :, 1:]).sum(axis=(1, 2)) +
+                        (boards[:, :, 1:] >= boards[:, :, :-1]).sum(axis=(1, 2)) +
+                        (boards[:, :-1, :] >= boards[:, 1:, :]).sum(axis=(1, 2)) +
+                        (boards[:, 1:, :] >= boards[:, :-1, :]).sum(axis=(1, 2)))
+        
+        # Smoothness: only pairs where both tiles are present count
+        right = boards[:, :, :-1], boards[:, :, 1:]
+        below = boards[:, :-1, :], boards[:, 1:, :]
+        smoothness = -(np.where((right[0] != 0) & (right[1] != 0), np.abs(right[0] - right[1]), 0).sum(axis=(1, 2)) +
+                       np.where((below[0] != 0) & (below[1] != 0), np.abs(below[0] - below[1]), 0).sum(axis=(1, 2)))
+        
+        # Corner bonus: the largest tile is in any of the 4 corners
+        max_value = boards.max(axis=(1, 2))
+        corners = boards[:, (0, 0, 3, 3), (0, 3, 0, 3)]
+        corner_bonus = np.where((corners == max_value[:, None]).any(axis=1), max_value * 10, 0)
+        
+        return (empty_cells * 20 +
+                monotonicity * 1.5 +
+                smoothness * 0.1 +
+                corner_bonus)
+    
     def monotonicity_score(self, grid):
         # Check if rows and columns are monotonic
         score = 0
@@ -254,9 +506,14 @@ class AutoPlayer:
                         
         return smoothness
     
-    def play(self, target=16384, delay=0.1, max_moves=5000):
-        print(f"Starting auto-play to reach {target}...")
-        print("Strategy: Expectimax algorithm with depth 2")
+    def play(self, target=16384, delay=0.1, max_moves=5000, verbose=True):
+        # verbose=False keeps benchmark runs quiet
+        log = print if verbose else lambda *args, **kwargs: None
+        log(f"Starting auto-play to reach {target}...")
+        if self.time_budget_ms is None:
+            log(f"Strategy: Expectimax algorithm with depth {self.depth}")
+        else:
+            log(f"Strategy: Expectimax with iterative deepening, {self.time_budget_ms} ms per move")
         
         while (not self.game.is_game_over() and 
                self.game.get_max_tile() < target and 
@@ -266,26 +523,79 @@ class AutoPlayer:
             self.game.move(move)
             self.moves += 1
             
+            if self.time_budget_ms is not None:
+                depth, nodes, elapsed_ms = self.search_log[-1]
+                log(f"Move {self.moves}: depth {depth}, {nodes} nodes, {elapsed_ms:.1f} ms")
+            
             if self.moves % 100 == 0:
-                print(f"Moves: {self.moves}, Score: {self.game.score}, Max Tile: {self.game.get_max_tile()}")
-                self.game.display()
+                log(f"Moves: {self.moves}, Score: {self.game.score}, Max Tile: {self.game.get_max_tile()}")
+                if verbose:
+                    self.game.display()
                 
             time.sleep(delay)
             
-        print("\n" + "="*50)
-        print("Game Over!")
-        print(f"Total moves: {self.moves}")
-        print(f"Final score: {self.game.score}")
-        print(f"Max tile: {self.game.get_max_tile()}")
-        self.game.display()
+        self.close()
+        log("\n" + "="*50)
+        log("Game Over!")
+        log(f"Total moves: {self.moves}")
+        log(f"Final score: {self.game.score}")
+        log(f"Max tile: {self.game.get_max_tile()}")
+        if self.search_log:
+            total_nodes = sum(nodes for _, nodes, _ in self.search_log)
+            total_ms = sum(ms for _, _, ms in self.search_log)
+            average_depth = sum(depth for depth, _, _ in self.search_log) / len(self.search_log)
+            log(f"Search: average depth {average_depth:.2f}, {total_nodes} nodes, "
+                f"{total_nodes / max(total_ms / 1000, 1e-9):.0f} nodes/s")
+        if self.cache is not None:
+            stats = self.cache.stats()
+            log(f"Cache: {stats['hits']} hits, {stats['misses']} misses, "
+                f"{stats['evictions']} evictions ({stats['hit_rate']*100:.1f}% hit rate)")
+        if self.stats is not None:
+            self.stats.close()
+            summary = self.stats.summary()
+            log(f"Nodes: {summary['max_nodes']} max, {summary['chance_nodes']} chance, "
+                f"{summary['leaf_nodes']} leaves, branching factor {summary['average_branching_factor']:.2f}")
+            log(f"Move times (ms, upper bound: moves): {summary['time_histogram_ms']}")
+        if self.book is not None:
+            self.book.flush()
+            stats = self.book.stats()
+            log(f"Book: {self.book_hits} moves from the book, {stats['stores']} stored, "
+                f"{stats['evictions']} evictions, {stats['entries']} entries")
+        if verbose:
+            self.game.display()
         
         if self.game.get_max_tile() >= target:
-            print("🎉 Successfully reached the target!")
+            log("🎉 Successfully reached the target!")
         else:
-            print("❌ Failed to reach the target.")
+            log("❌ Failed to reach the target.")
             
         return self.game.get_max_tile() >= target
 
+# Worker side of the root-parallel search. Each process keeps one serial
+# AutoPlayer (and its transposition table) for the lifetime of the pool.
+_worker_player = None
+
+def _init_search_worker(game_class, game_options, search_options):
+    global _worker_player
+    _worker_player = AutoPlayer(game_class(**game_options), **search_options)
+
+def _search_subtree(task):
+    board, depth, prob, deadline = task
+    player = _worker_player
+    player.nodes = 0
+    if deadline is not None:
+        if time.time() > deadline:
+            return None, 0
+        player.deadline = time.perf_counter() + (deadline - time.time())
+        player.next_check = player.TIME_CHECK_INTERVAL
+    try:
+        score = player.expectimax(board, depth, True, prob)
+    except SearchTimeout:
+        score = None
+    finally:
+        player.deadline = None
+    return score, player.nodes
+
 # Simple strategy for comparison
 class SimpleCornerPlayer:
     def __init__(self, game):
@@ -308,8 +618,10 @@ class SimpleCornerPlayer:
         # Default to right move
         return 1
     
-    def play(self, target=16384, delay=0.1, max_moves=5000):
-        print(f"Starting simple corner strategy to reach {target}...")
+    def play(self, target=16384, delay=0.1, max_moves=5000, verbose=True):
+        # verbose=False keeps benchmark runs quiet
+        log = print if verbose else lambda *args, **kwargs: None
+        log(f"Starting simple corner strategy to reach {target}...")
         
         while (not self.game.is_game_over() and 
                self.game.get_max_tile() < target and 
@@ -318,46 +630,63 @@ class SimpleCornerPlayer:
             move = self.get_move()
             moved = self.game.move(move)
             
+            if not moved:
+                # The preferred move is blocked; fall back to any move that
+                # works instead of retrying it forever
+                for move in (1, 2, 3, 0):
+                    moved = self.game.move(move)
+                    if moved:
+                        break
+            
             if moved:
                 self.last_move = move
                 self.moves += 1
             
             if self.moves % 100 == 0:
-                print(f"Moves: {self.moves}, Score: {self.game.score}, Max Tile: {self.game.get_max_tile()}")
-                self.game.display()
+                log(f"Moves: {self.moves}, Score: {self.game.score}, Max Tile: {self.game.get_max_tile()}")
+                if verbose:
+                    self.game.display()
                 
             time.sleep(delay)
             
-        print("\n" + "="*50)
-        print("Game Over!")
-        print(f"Total moves: {self.moves}")
-        print(f"Final score: {self.game.score}")
-        print(f"Max tile: {self.game.get_max_tile()}")
-        self.game.display()
+        log("\n" + "="*50)
+        log("Game Over!")
+        log(f"Total moves: {self.moves}")
+        log(f"Final score: {self.game.score}")
+        log(f"Max tile: {self.game.get_max_tile()}")
+        if verbose:
+            self.game.display()
         
         if self.game.get_max_tile() >= target:
-            print("🎉 Successfully reached the target!")
+            log("🎉 Successfully reached the target!")
         else:
-            print("❌ Failed to reach the target.")
+            log("❌ Failed to reach the target.")
             
         return self.game.get_max_tile() >= target
 
 # Run multiple games to test success rate
-def test_strategy(strategy_class, num_games=10, target=16384):
+# game_class picks the board backend: Game2048 or BitboardGame2048
+# player_options are passed to the player (AutoPlayer: depth, cache_size, ...)
+def test_strategy(strategy_class, num_games=10, target=16384, game_class=Game2048, replay_dir=None,
+                  **player_options):
+    # replay_dir: save every game there as game_<n>.2048_replay
     successes = 0
     max_tiles = []
     
     for i in range(num_games):
         print(f"\n=== Game {i+1}/{num_games} ===")
-        game = Game2048()
+        # The standard 2/4 spawns; easy mode's chance nodes branch much wider
+        game = game_class(easy=False)
+        recorder = ReplayRecorder(game) if replay_dir else None
         
-        if strategy_class == AutoPlayer:
-            player = AutoPlayer(game)
-            success = player.play(target=target, delay=0, max_moves=10000)
-        else:
-            player = SimpleCornerPlayer(game)
-            success = player.play(target=target, delay=0, max_moves=10000)
+        # Every player takes (game, **options) and plays the same way
+        # (see players_2048.py)
+        player = strategy_class(game, **player_options)
+        success = player.play(target=target, delay=0, max_moves=10000)
             
+        if recorder:
+            os.makedirs(replay_dir, exist_ok=True)
+            recorder.save(os.path.join(replay_dir, f"game_{i+1}.2048_replay"))
         if success:
             successes += 1
         max_tiles.append(game.get_max_tile())
@@ -378,4 +707,4 @@ if __name__ == "__main__":
     
     # Test the expectimax strategy
     print("\n\nTesting expectimax strategy...")
-    test_strategy(AutoPlayer, num_games=5, target=16384)
\ No newline at end of file
+    test_strategy(AutoPlayer, num_games=5, target=16384, game_class=BitboardGame2048)
\ No newline at end of file
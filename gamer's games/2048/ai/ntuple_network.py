@@ -0,0 +1,87 @@
+import os
+import numpy as np
+
+from heuristic_tables import CACHE_DIR
+from symmetry_2048 import symmetries
+# (on the path once bitboard_2048 has been imported)
+from engine_2048 import atomic_write
+
+# N-tuple network evaluator for the 2048 AI.
+#
+# Instead of hand-weighted features, the value of a bitboard is the sum of
+# learned weights looked up by small groups of cells ("tuples"). Every
+# tuple covers 4 cells, so its index is 4 nibbles = a uint16 and its weight
+# table has 65536 float32 entries. The tuples are
+#   0  outer row       cells 0 1 2 3
+#   1  inner row       cells 4 5 6 7
+#   2  corner square   cells 0 1 4 5
+#   3  edge square     cells 1 2 5 6
+#   4  centre square   cells 5 6 9 10
+# and each one is applied to all 8 symmetric forms of the board, so the
+# weights are shared between mirrored and rotated positions (40 lookups).
+#
+# The weights estimate the score still to be earned from an afterstate
+# (the board right after a slide, before the spawn). They are trained by
+# train_ntuple.py and stored as a (5, 65536) float32 .npy file.
+
+NUM_TUPLES = 5
+TUPLE_SIZE = 65536
+DEFAULT_WEIGHTS = os.path.join(CACHE_DIR, "ntuple_weights.npy")
+
+
+def tuple_indices(board):
+    # Offsets into the flattened weight array for the 5 tuples on one form
+    return (board & 0xFFFF,
+            0x10000 | ((board >> 16) & 0xFFFF),
+            0x20000 | (board & 0xFF) | ((board >> 8) & 0xFF00),
+            0x30000 | ((board >> 4) & 0xFF) | ((board >> 12) & 0xFF00),
+            0x40000 | ((board >> 20) & 0xFF) | ((board >> 28) & 0xFF00))
+
+
+def features(board):
+    """Flat weight indices used by a bitboard (5 per symmetric form)."""
+    indices = []
+    for form in symmetries(board):
+        indices += tuple_indices(form)
+    return indices
+
+
+def save_weights(weights, path):
+    weights = np.asarray(weights, dtype=np.float32).reshape(NUM_TUPLES, TUPLE_SIZE)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    atomic_write(path, lambda f: np.save(f, weights))
+
+
+def load_weights(path):
+    if not os.path.exists(path):
+        train_command = "python train_ntuple.py"
+        if os.path.abspath(path) != os.path.abspath(DEFAULT_WEIGHTS):
+            train_command += f" --weights {path}"
+        raise FileNotFoundError(f"No n-tuple weights at {path}; train them first with: {train_command}")
+    weights = np.load(path)
+    if weights.shape != (NUM_TUPLES, TUPLE_SIZE) or weights.dtype != np.float32:
+        raise ValueError(f"{path} is not an n-tuple weight file")
+    return weights
+
+
+class NTupleNetwork:
+    def __init__(self, path=DEFAULT_WEIGHTS):
+        # path=None starts from all-zero weights (for training)
+        if path is None:
+            self.weights = [0.0] * (NUM_TUPLES * TUPLE_SIZE)
+        else:
+            # A flat list for the scalar path, like HeuristicTables
+            self.weights = load_weights(path).ravel().tolist()
+
+    def evaluate(self, board):
+        weights = self.weights
+        return sum(weights[i] for i in features(board))
+
+    def update(self, board, delta):
+        # One TD step: spread delta over every weight the board uses
+        weights = self.weights
+        for i in features(board):
+            weights[i] += delta
+
+    def save(self, path=DEFAULT_WEIGHTS):
+        save_weights(self.weights, path)
@@ -0,0 +1,124 @@
+import os
+import numpy as np
+
+from symmetry_2048 import canonical
+# (on the path once bitboard_2048 has been imported)
+from engine_2048 import atomic_write
+
+# Persistent move cache ("opening book") for the 2048 AI.
+#
+# The first moves of every game go through the same few positions, so the
+# best move the search found for a board is kept on disk and reused by
+# later games and runs. Boards are stored in canonical form: the 8
+# rotations/reflections of a board share one entry, and the stored move is
+# mapped back through the symmetry on the way out.
+#
+# The file is a .npy array of (key, value) uint64 pairs, memory-mapped so
+# opening it costs nothing and processes sharing it (the benchmark pool)
+# see each other's entries:
+#   key    canonical bitboard (0 = empty slot)
+#   value  bits 0-1 move, 2-7 search depth, 8-31 times used,
+#          32-63 check bits derived from the key
+# The check bits let a reader reject an entry torn by a concurrent writer.
+#
+# The table has a fixed number of slots, grouped in buckets of 4 found by
+# hashing the key. When a bucket is full, the entry with the lowest
+# (depth, times used) is evicted.
+
+BUCKET_SIZE = 4
+HASH_MULTIPLIER = 0x9E3779B97F4A7C15
+MASK64 = 0xFFFFFFFFFFFFFFFF
+MAX_DEPTH = 63
+MAX_USES = (1 << 24) - 1
+
+
+def _mix(key):
+    return (key * HASH_MULTIPLIER) & MASK64
+
+
+class OpeningBook:
+    def __init__(self, path, max_entries=1 << 20):
+        # max_entries only matters when the file is created; an existing
+        # book keeps its own size
+        if not os.path.exists(path):
+            self.create(path, max_entries)
+        self.path = path
+        self.slots = np.load(path, mmap_mode='r+')
+        self.num_buckets = len(self.slots) // BUCKET_SIZE
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    @staticmethod
+    def create(path, max_entries):
+        # A whole number of buckets
+        num_slots = max(max_entries // BUCKET_SIZE, 1) * BUCKET_SIZE
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        atomic_write(path, lambda f: np.save(f, np.zeros((num_slots, 2), dtype=np.uint64)))
+
+    def _bucket(self, key):
+        mixed = _mix(key)
+        start = (mixed % self.num_buckets) * BUCKET_SIZE
+        return start, mixed >> 32
+
+    def get(self, board, min_depth=0):
+        """Best move for a bitboard, or None if the book doesn't have one
+        searched at least min_depth deep."""
+        key, perm = canonical(board)
+        start, check = self._bucket(key)
+        for index in range(start, start + BUCKET_SIZE):
+            slot_key, value = (int(x) for x in self.slots[index])
+            if slot_key != key or value >> 32 != check:
+                continue
+            if (value >> 2) & MAX_DEPTH < min_depth:
+                break
+            uses = (value >> 8) & MAX_USES
+            if uses < MAX_USES:
+                self.slots[index, 1] = value + (1 << 8)
+            self.hits += 1
+            return perm.index(value & 3)
+        self.misses += 1
+        return None
+
+    def put(self, board, move, depth):
+        key, perm = canonical(board)
+        start, check = self._bucket(key)
+        depth = min(depth, MAX_DEPTH)
+        victim = None
+        victim_rank = None
+        for index in range(start, start + BUCKET_SIZE):
+            slot_key, value = (int(x) for x in self.slots[index])
+            if slot_key == key:
+                # Same board: keep the deeper result
+                if (value >> 2) & MAX_DEPTH > depth:
+                    return
+                victim = index
+                break
+            if slot_key == 0:
+                victim = index
+                break
+            rank = ((value >> 2) & MAX_DEPTH, (value >> 8) & MAX_USES)
+            if victim_rank is None or rank < victim_rank:
+                victim, victim_rank = index, rank
+        else:
+            self.evictions += 1
+        self.slots[victim] = (key, (check << 32) | (depth << 2) | perm[move])
+        self.stores += 1
+
+    def flush(self):
+        self.slots.flush()
+
+    def __len__(self):
+        return int(np.count_nonzero(self.slots[:, 0]))
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self),
+            'hits': self.hits,
+            'misses': self.misses,
+            'stores': self.stores,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,40 @@
+import importlib
+
+from improved_2048_ai import AutoPlayer, SimpleCornerPlayer
+
+# Registry of the 2048 players.
+#
+# Every player follows the same small interface:
+#   player = PlayerClass(game, **options)
+#   success = player.play(target=..., delay=0, max_moves=..., verbose=False)
+#   player.moves                        moves played so far
+# so benchmarks and tournaments can run any of them by name. cost is a
+# rough relative time per move, used to run the cheap players first.
+
+# The snake player's module name starts with a digit, so it can only be
+# imported through importlib
+snake_player = importlib.import_module('2048_auto_player')
+
+PLAYERS = {}
+
+
+def register_player(name, player_class, cost=1.0, description=""):
+    PLAYERS[name] = {
+        'class': player_class,
+        'cost': cost,
+        'description': description,
+    }
+
+
+def make_player(name, game, **options):
+    if name not in PLAYERS:
+        raise ValueError(f"Unknown player: {name} (known: {', '.join(sorted(PLAYERS))})")
+    return PLAYERS[name]['class'](game, **options)
+
+
+register_player('corner', SimpleCornerPlayer, 1,
+                "alternates right and down, falls back to any legal move")
+register_player('snake', snake_player.AutoPlayer, 20,
+                "greedy one-move lookahead on snake-shaped corner weights")
+register_player('expectimax', AutoPlayer, 500,
+                "expectimax search (depth, evaluator, cache, ... as options)")
@@ -0,0 +1,133 @@
+import json
+import os
+from collections import Counter
+
+# Opt-in search instrumentation for AutoPlayer.
+#
+# With AutoPlayer(instrument=True) every searched node is counted by its
+# remaining depth and kind (max, chance or leaf), and every move gets a
+# record with its node counts, cache hits, effective branching factor and
+# wall time. Move times are also collected into a histogram with
+# power-of-two millisecond buckets. Records can be streamed to a JSON lines
+# file as they happen, or exported at the end.
+#
+# When instrumentation is off AutoPlayer never calls into this module, so
+# the search pays nothing for it.
+#
+# In root-parallel mode the per-depth counts only cover the nodes searched
+# in the main process; the node total still includes the workers.
+
+
+def time_bucket(ms):
+    # Upper bound of the power-of-two bucket a time falls into: 1, 2, 4, ... ms
+    bucket = 1
+    while ms > bucket:
+        bucket *= 2
+    return bucket
+
+
+def branching_factor(nodes, depth):
+    # b with b + b^2 + ... + b^(depth+1) = nodes, found by bisection; the
+    # root's children are the first level below the searched position
+    levels = depth + 1
+    if nodes <= levels:
+        return 1.0 if nodes else 0.0
+    low, high = 1.0, float(nodes)
+    for _ in range(50):
+        b = (low + high) / 2
+        total = b * (b ** levels - 1) / (b - 1)
+        if total > nodes:
+            high = b
+        else:
+            low = b
+    return (low + high) / 2
+
+
+class SearchStats:
+    def __init__(self, path=None, tags=None):
+        # path: JSON lines file every move record is appended to
+        # tags: extra fields written into every record (e.g. the game seed)
+        self.path = path
+        self.tags = tags or {}
+        self.records = []
+        self.time_histogram = Counter()
+        self.fd = None
+        self.start_move()
+
+    def start_move(self):
+        self.nodes_by_depth = Counter()
+        self.max_nodes = 0
+        self.chance_nodes = 0
+        self.leaf_nodes = 0
+
+    def count_node(self, depth, is_max_turn, count=1):
+        # count: several nodes of the same kind at once (batched leaves)
+        self.nodes_by_depth[depth] += count
+        if depth == 0:
+            self.leaf_nodes += count
+        elif is_max_turn:
+            self.max_nodes += count
+        else:
+            self.chance_nodes += count
+
+    def end_move(self, depth, nodes, ms, cache_hits=0, cache_misses=0, book=False):
+        record = dict(self.tags)
+        record.update({
+            'move': len(self.records) + 1,
+            'depth': depth,
+            'nodes': nodes,
+            'max_nodes': self.max_nodes,
+            'chance_nodes': self.chance_nodes,
+            'leaf_nodes': self.leaf_nodes,
+            'nodes_by_depth': {str(d): self.nodes_by_depth[d] for d in sorted(self.nodes_by_depth, reverse=True)},
+            'cache_hits': cache_hits,
+            'cache_misses': cache_misses,
+            'branching_factor': branching_factor(nodes, depth),
+            'ms': ms,
+            'book': book,
+        })
+        self.records.append(record)
+        self.time_histogram[time_bucket(ms)] += 1
+        if self.path is not None:
+            if self.fd is None:
+                self.fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            # Each record goes out in a single unbuffered write to an
+            # O_APPEND file, so processes sharing the file (benchmark
+            # workers) never interleave inside a line
+            os.write(self.fd, (json.dumps(record) + "\n").encode())
+        self.start_move()
+        return record
+
+    def summary(self):
+        searched = [r for r in self.records if not r['book']]
+        nodes = sum(r['nodes'] for r in searched)
+        ms = sum(r['ms'] for r in searched)
+        lookups = sum(r['cache_hits'] + r['cache_misses'] for r in searched)
+        summary = dict(self.tags)
+        summary.update({
+            'moves': len(self.records),
+            'book_moves': len(self.records) - len(searched),
+            'nodes': nodes,
+            'max_nodes': sum(r['max_nodes'] for r in searched),
+            'chance_nodes': sum(r['chance_nodes'] for r in searched),
+            'leaf_nodes': sum(r['leaf_nodes'] for r in searched),
+            'cache_hit_rate': sum(r['cache_hits'] for r in searched) / lookups if lookups else 0.0,
+            'average_branching_factor': (sum(r['branching_factor'] for r in searched) / len(searched)
+                                         if searched else 0.0),
+            'nodes_per_sec': nodes / (ms / 1000) if ms else 0.0,
+            'time_histogram_ms': {str(bucket): self.time_histogram[bucket]
+                                  for bucket in sorted(self.time_histogram)},
+        })
+        return summary
+
+    def export_jsonl(self, path):
+        # Every move record, then a final {"summary": ...} line
+        with open(path, "w") as f:
+            for record in self.records:
+                f.write(json.dumps(record) + "\n")
+            f.write(json.dumps({'summary': self.summary()}) + "\n")
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
@@ -0,0 +1,79 @@
+from bitboard_2048 import transpose
+
+# The 8 symmetries of the 2048 board (4 rotations, each optionally mirrored).
+#
+# Mirrored or rotated boards play exactly alike, so caches can store one
+# entry per symmetry class: canonical(board) picks the smallest of the 8
+# forms as the class representative and returns the permutation that maps
+# moves on the original board to moves on the representative.
+#
+# Works on bitboards (see bitboard_2048) with mask-and-shift steps only;
+# canonical_grid does the same for tuple-of-rows boards.
+
+# Moves are 0 up, 1 right, 2 down, 3 left; perm[m] is the move that m
+# becomes on the transformed board
+IDENTITY_MOVES = (0, 1, 2, 3)
+MIRROR_MOVES = (0, 3, 2, 1)     # left <-> right
+FLIP_MOVES = (2, 1, 0, 3)       # up <-> down
+TRANSPOSE_MOVES = (3, 2, 1, 0)  # up <-> left, right <-> down
+
+
+def _compose(*perms):
+    moves = list(range(4))
+    for perm in perms:
+        moves = [perm[m] for m in moves]
+    return tuple(moves)
+
+
+# Move permutation of every form, in the order canonical() builds them:
+# b, mirror(b), flip(b), flip(mirror(b)), then the same four of transpose(b)
+SYMMETRY_MOVES = tuple(
+    _compose(*first, *rest)
+    for first in ((), (TRANSPOSE_MOVES,))
+    for rest in ((), (MIRROR_MOVES,), (FLIP_MOVES,), (MIRROR_MOVES, FLIP_MOVES))
+)
+
+
+def flip(board):
+    # Reverse the order of the rows (upside down)
+    return (((board & 0xFFFF) << 48) | ((board & 0xFFFF0000) << 16) |
+            ((board >> 16) & 0xFFFF0000) | (board >> 48))
+
+
+def mirror(board):
+    # Reverse every row (left to right): swap nibbles, then bytes
+    board = ((board & 0x0F0F0F0F0F0F0F0F) << 4) | ((board >> 4) & 0x0F0F0F0F0F0F0F0F)
+    return ((board & 0x00FF00FF00FF00FF) << 8) | ((board >> 8) & 0x00FF00FF00FF00FF)
+
+
+def symmetries(board):
+    """All 8 forms of a bitboard, in SYMMETRY_MOVES order."""
+    m = mirror(board)
+    t = transpose(board)
+    mt = mirror(t)
+    return (board, m, flip(board), flip(m), t, mt, flip(t), flip(mt))
+
+
+def canonical_board(board):
+    """The class representative alone (cheapest form, for cache keys)."""
+    m = mirror(board)
+    t = transpose(board)
+    mt = mirror(t)
+    return min(board, m, flip(board), flip(m), t, mt, flip(t), flip(mt))
+
+
+def canonical(board):
+    """(representative, perm) where perm[move] is the same move played on
+    the representative."""
+    forms = symmetries(board)
+    best = min(forms)
+    return best, SYMMETRY_MOVES[forms.index(best)]
+
+
+def canonical_grid(board):
+    """canonical_board for a tuple-of-rows board (any tile values)."""
+    mirrored = tuple(row[::-1] for row in board)
+    transposed = tuple(zip(*board))
+    mirrored_t = tuple(row[::-1] for row in transposed)
+    return min(board, mirrored, board[::-1], mirrored[::-1],
+               transposed, mirrored_t, transposed[::-1], mirrored_t[::-1])
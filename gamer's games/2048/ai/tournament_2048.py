@@ -0,0 +1,174 @@
+import argparse
+import ast
+import json
+import math
+import os
+import statistics
+import time
+from collections import Counter
+from multiprocessing import Pool
+
+from benchmark_2048 import GAME_CLASSES, play_game
+from players_2048 import PLAYERS
+
+# Tournament between registered 2048 players.
+#
+# Every entrant plays the same seeds, in rounds of --batch seeds, cheapest
+# entrant first (by registry cost in the first round, then by measured time
+# per game). After each round (once --min-games are in) the mean score
+# of every entrant gets a confidence interval, and the tournament stops as
+# soon as no two intervals overlap: the ranking won't change with more
+# games. Throughput is reported per entrant.
+#
+# Entrants are registry names, optionally with options:
+#   python tournament_2048.py corner snake expectimax:depth=1,evaluator=tables \
+#       --min-games 10 --max-games 200 --workers 8
+
+Z_SCORES = {0.9: 1.645, 0.95: 1.96, 0.99: 2.576}
+
+
+def parse_entrant(spec):
+    # "name:key=value,key=value" -> (label, name, options)
+    name, _, option_text = spec.partition(':')
+    if name not in PLAYERS:
+        raise ValueError(f"Unknown player: {name} (known: {', '.join(sorted(PLAYERS))})")
+    options = {}
+    for item in filter(None, option_text.split(',')):
+        key, _, value = item.partition('=')
+        try:
+            options[key] = ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            options[key] = value
+    # Games already run in pool workers, which can't start pools of their own
+    if 'workers' in options:
+        raise ValueError(f"{spec}: entrants can't use workers; use --workers to run games in parallel")
+    return spec, name, options
+
+
+def confidence_interval(values, z):
+    mean = statistics.mean(values)
+    if len(values) < 2:
+        return mean, math.inf
+    return mean, z * statistics.stdev(values) / math.sqrt(len(values))
+
+
+def separated(intervals):
+    # True once the intervals, sorted by mean, don't overlap pairwise
+    ordered = sorted(intervals, key=lambda interval: interval[0])
+    return all(low[0] + low[1] < high[0] - high[1] for low, high in zip(ordered, ordered[1:]))
+
+
+def run_tournament(entrants, seed=0, min_games=10, max_games=100, batch=None, workers=None,
+                   confidence=0.95, target=16384, max_moves=10000, board='bitboard', easy=False,
+                   log=print):
+    entrants = sorted((parse_entrant(spec) for spec in entrants), key=lambda e: PLAYERS[e[1]]['cost'])
+    z = Z_SCORES[confidence]
+    games = {label: [] for label, _, _ in entrants}
+    batch = batch or workers or os.cpu_count()
+    stopped_early = False
+
+    start = time.perf_counter()
+    with Pool(workers) as pool:
+        for first in range(seed, seed + max_games, batch):
+            seeds = range(first, min(first + batch, seed + max_games))
+            jobs = [{
+                'seed': s,
+                'player': name,
+                'label': label,
+                'board': board,
+                'easy': easy,
+                'target': target,
+                'max_moves': max_moves,
+                'replay_dir': None,
+                'player_options': options,
+            } for label, name, options in entrants for s in seeds]
+            for job, result in zip(jobs, pool.map(play_game, jobs)):
+                games[job['label']].append(result)
+
+            played = len(games[entrants[0][0]])
+            intervals = [confidence_interval([g['score'] for g in games[label]], z)
+                         for label, _, _ in entrants]
+            log(f"{played} games: " + ", ".join(f"{label} {mean:.0f}±{half:.0f}"
+                                                 for (label, _, _), (mean, half) in zip(entrants, intervals)))
+            if played >= min_games and separated(intervals):
+                stopped_early = played < max_games
+                break
+            entrants.sort(key=lambda e: sum(g['seconds'] for g in games[e[0]]))
+    wall_seconds = time.perf_counter() - start
+
+    standings = [summarize_entrant(label, games[label], z) for label, _, _ in entrants]
+    standings.sort(key=lambda s: s['mean_score'], reverse=True)
+    return {
+        'config': {
+            'seed': seed,
+            'min_games': min_games,
+            'max_games': max_games,
+            'confidence': confidence,
+            'target': target,
+            'max_moves': max_moves,
+            'board': board,
+            'easy': easy,
+        },
+        'games_per_entrant': len(games[entrants[0][0]]),
+        'stopped_early': stopped_early,
+        'wall_seconds': wall_seconds,
+        'standings': standings,
+    }
+
+
+def summarize_entrant(label, games, z):
+    mean, half_width = confidence_interval([g['score'] for g in games], z)
+    game_seconds = sum(g['seconds'] for g in games) or 1e-9
+    histogram = Counter(g['max_tile'] for g in games)
+    return {
+        'entrant': label,
+        'games': len(games),
+        'mean_score': mean,
+        'interval': half_width,
+        'success_rate': sum(1 for g in games if g['success']) / len(games),
+        'max_tile_histogram': {str(tile): histogram[tile] for tile in sorted(histogram)},
+        'moves_per_sec': sum(g['moves'] for g in games) / game_seconds,
+        'games_per_sec': len(games) / game_seconds,
+    }
+
+
+def print_report(report):
+    print(f"=== Tournament: {report['games_per_entrant']} games each"
+          f"{' (stopped early)' if report['stopped_early'] else ''}, "
+          f"{report['config']['confidence']*100:.0f}% intervals ===")
+    for rank, s in enumerate(report['standings'], 1):
+        print(f"{rank}. {s['entrant']}: {s['mean_score']:.0f} ± {s['interval']:.0f}, "
+              f"success {s['success_rate']*100:.1f}%, "
+              f"{s['moves_per_sec']:.1f} moves/s, {s['games_per_sec']:.2f} games/s")
+        print(f"   max tiles: {s['max_tile_histogram']}")
+    print(f"Wall time: {report['wall_seconds']:.1f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank 2048 players on shared seeds.")
+    parser.add_argument('entrants', nargs='+', help="player[:key=value,...]; players: " + ", ".join(sorted(PLAYERS)))
+    parser.add_argument('--seed', type=int, default=0, help="seed of the first game")
+    parser.add_argument('--min-games', type=int, default=10)
+    parser.add_argument('--max-games', type=int, default=100)
+    parser.add_argument('--batch', type=int, default=None, help="seeds per round (default: workers)")
+    parser.add_argument('--workers', type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument('--confidence', type=float, choices=sorted(Z_SCORES), default=0.95)
+    parser.add_argument('--target', type=int, default=16384)
+    parser.add_argument('--max-moves', type=int, default=10000)
+    parser.add_argument('--board', choices=sorted(GAME_CLASSES), default='bitboard')
+    parser.add_argument('--easy', action='store_true',
+                        help="easy-mode spawns (default: 2s, and 4s 10%% of the time)")
+    parser.add_argument('--json', help="write the report to this JSON file")
+    args = parser.parse_args()
+
+    report = run_tournament(args.entrants, args.seed, args.min_games, args.max_games, args.batch,
+                            args.workers, args.confidence, args.target, args.max_moves,
+                            args.board, args.easy)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import argparse
+import os
+import time
+from collections import Counter
+from multiprocessing import Pool
+
+import numpy as np
+
+from bitboard_2048 import BitboardGame2048, slide
+from ntuple_network import DEFAULT_WEIGHTS, NTupleNetwork, save_weights
+
+# Temporal-difference self-play trainer for the n-tuple network.
+#
+# Games are played greedily on afterstates: every move picks the slide
+# with the best reward + V(afterstate), and the previous afterstate's value
+# is pulled towards that (TD(0)); a lost game pulls the last one towards 0.
+#
+# Training runs in epochs. In each epoch every worker process loads the
+# current weights, plays its share of the games while learning on its own
+# copy, and sends back how its weights changed. The changes of all workers
+# are added up and saved before the next epoch starts.
+#
+# Example:
+#   python train_ntuple.py --epochs 50 --games 400 --workers 8
+
+
+def play_training_game(network, seed, alpha, easy):
+    # One self-play game with online TD(0) updates; returns (score, max tile)
+    game = BitboardGame2048(seed=seed, easy=easy)
+    previous = None
+    while True:
+        board = game.state()
+        best = None
+        for move in range(4):
+            after, reward = slide(board, move)
+            if after == board:
+                continue
+            value = reward + network.evaluate(after)
+            if best is None or value > best[0]:
+                best = (value, move, after)
+        if best is None:
+            break
+        value, move, after = best
+        if previous is not None:
+            network.update(previous, alpha * (value - network.evaluate(previous)))
+        game.move(move)
+        previous = after
+    if previous is not None:
+        network.update(previous, alpha * -network.evaluate(previous))
+    return game.score, game.get_max_tile()
+
+
+def train_worker(job):
+    # Runs in a worker process: train on a private copy and return the
+    # changed weights as (indices, deltas)
+    if os.path.exists(job['weights']):
+        network = NTupleNetwork(job['weights'])
+    else:
+        network = NTupleNetwork(None)
+    start = np.array(network.weights, dtype=np.float32)
+    results = [play_training_game(network, seed, job['alpha'], job['easy']) for seed in job['seeds']]
+    delta = np.array(network.weights, dtype=np.float32) - start
+    changed = np.flatnonzero(delta)
+    return changed, delta[changed], results
+
+
+def train(weights_path=DEFAULT_WEIGHTS, epochs=10, games=100, workers=None, alpha=0.0025,
+          seed=0, easy=False, log=print):
+    workers = workers or os.cpu_count()
+    if os.path.exists(weights_path):
+        weights = NTupleNetwork(weights_path).weights
+    else:
+        weights = NTupleNetwork(None).weights
+        save_weights(weights, weights_path)
+    weights = np.array(weights, dtype=np.float32)
+
+    with Pool(workers) as pool:
+        for epoch in range(epochs):
+            start = time.perf_counter()
+            # Each epoch plays fresh seeds, split evenly over the workers
+            first = seed + epoch * games
+            jobs = [{'weights': weights_path, 'alpha': alpha, 'easy': easy,
+                     'seeds': list(range(first + k, first + games, workers))}
+                    for k in range(min(workers, games))]
+            results = []
+            for changed, delta, worker_results in pool.imap_unordered(train_worker, jobs):
+                weights[changed] += delta
+                results += worker_results
+            save_weights(weights, weights_path)
+
+            seconds = time.perf_counter() - start
+            scores = [score for score, _ in results]
+            tiles = Counter(tile for _, tile in results)
+            log(f"Epoch {epoch + 1}/{epochs}: average score {sum(scores) / len(scores):.0f}, "
+                f"max tiles {dict(sorted(tiles.items()))}, {len(results) / seconds:.1f} games/s")
+    return weights_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the 2048 n-tuple network by TD self-play.")
+    parser.add_argument('--weights', default=DEFAULT_WEIGHTS, help="weight file (continued if it exists)")
+    parser.add_argument('--epochs', type=int, default=10)
+    parser.add_argument('--games', type=int, default=100, help="games per epoch")
+    parser.add_argument('--workers', type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument('--alpha', type=float, default=0.0025, help="learning rate per weight")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--easy', action='store_true',
+                        help="easy-mode spawns (default: 2s, and 4s 10%% of the time, as benchmarked)")
+    args = parser.parse_args()
+    train(args.weights, args.epochs, args.games, args.workers, args.alpha, args.seed, args.easy)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+from collections import OrderedDict
+
+# Bounded cache of expectimax values for the 2048 AI.
+#
+# Keys are (board, depth, is_max_turn) so a value is only reused for the
+# exact same search question. Two replacement policies are available:
+#   'lru'   - evict the least recently used entry once the table is full
+#   'depth' - fixed slot array indexed by hash; a new entry only replaces
+#             the slot's occupant if it was searched at least as deep
+#             (deep results are the expensive ones worth keeping)
+
+
+class TranspositionTable:
+    def __init__(self, max_entries=200000, policy='lru'):
+        if policy not in ('lru', 'depth'):
+            raise ValueError(f"Unknown replacement policy: {policy}")
+        self.max_entries = max_entries
+        self.policy = policy
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.clear()
+
+    def clear(self):
+        if self.policy == 'lru':
+            self.entries = OrderedDict()
+        else:
+            self.slots = [None] * self.max_entries
+
+    def get(self, key):
+        if self.policy == 'lru':
+            value = self.entries.get(key)
+            if value is not None:
+                self.entries.move_to_end(key)
+        else:
+            slot = self.slots[hash(key) % self.max_entries]
+            value = slot[1] if slot is not None and slot[0] == key else None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def put(self, key, value):
+        if self.policy == 'lru':
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            if len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+        else:
+            index = hash(key) % self.max_entries
+            slot = self.slots[index]
+            if slot is not None and slot[0] != key:
+                # key[1] is the remaining search depth
+                if slot[0][1] > key[1]:
+                    return
+                self.evictions += 1
+            self.slots[index] = (key, value)
+
+    def __len__(self):
+        if self.policy == 'lru':
+            return len(self.entries)
+        return sum(1 for slot in self.slots if slot is not None)
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        return {
+            'entries': len(self),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hit_rate(),
+        }
@@ -0,0 +1,232 @@
+# 2048 headless engine
+# The rules of terminal-engine.py without any terminal I/O, so the TUI, the AI
+# players and long simulations all play exactly the same game.
+
+import math
+import os
+import random
+
+WIN_TILE = 2048
+
+# Move numbers shared by every player: 0 up, 1 right, 2 down, 3 left
+DIRECTIONS = {'W': 0, 'D': 1, 'S': 2, 'A': 3}
+
+
+def atomic_write(path, write, mode="wb") -> None:
+    """Create or replace a file: write(f) fills it under a temporary name
+    and it is then moved into place, so nobody ever reads it half-written.
+    If writing fails the temporary file is removed and path is untouched."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, mode) as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def compress_and_merge(line) -> tuple:
+    """Compresses non-zero values and merges adjacent equal numbers.
+    Returns the new line (as long as the one given) and the score gained
+    by the merges."""
+    size = len(line)
+    line = [num for num in line if num != 0]
+    gained = 0
+    for i in range(len(line) - 1):
+        if line[i] == line[i + 1]:
+            line[i] *= 2
+            gained += line[i]
+            line[i + 1] = 0
+    line = [num for num in line if num != 0]
+    return line + [0] * (size - len(line)), gained
+
+
+class Game2048:
+    """One game of 2048.
+
+    Boards handed to the search are immutable tuples of row tuples and are
+    handled by the static *_board helpers; subclasses may swap in another
+    board representation by overriding those helpers together with
+    state()/set_state() and empty_board().
+
+    rows, cols: board size (4x4 by default); the tuple board works for any
+               size
+
+    easy:      spawns are 2**k for k between the smallest tile and half the
+               largest tile (EASY_min/EASY_max in terminal-engine.py);
+               otherwise 2 (90%) or 4 (10%)
+    unlimited: reaching 2048 doesn't end the game
+    seed:      seeds the game's own random generator
+    """
+
+    def __init__(self, seed=None, easy=True, unlimited=False, rows=4, cols=4):
+        self.rows = rows
+        self.cols = cols
+        self.EMPTY_BOARD = self.empty_board(rows, cols)
+        self.seed = seed
+        self.easy = easy
+        self.unlimited = unlimited
+        self.rng = random.Random(seed)
+        # Optional replay_2048.ReplayRecorder, told about every played move
+        self.recorder = None
+        self.reset()
+
+    def reset(self) -> None:
+        """Start again from an empty board with one random tile."""
+        self.set_state(self.EMPTY_BOARD)
+        self.score = 0
+        self.moves = 0
+        self.add_tile()
+
+    # board state
+
+    @staticmethod
+    def empty_board(rows, cols):
+        return ((0,) * cols,) * rows
+
+    def state(self):
+        return tuple(tuple(row) for row in self.grid)
+
+    def set_state(self, board) -> None:
+        self.grid = [list(row) for row in board]
+
+    @staticmethod
+    def slide_board(board, direction) -> tuple:
+        """Slide a board (0: up, 1: right, 2: down, 3: left) without spawning.
+        Returns the new board and the score gained."""
+        if direction in (0, 2):
+            lines = [list(column) for column in zip(*board)]
+        else:
+            lines = [list(row) for row in board]
+        gained = 0
+        reverse = direction in (1, 2)
+        for k, line in enumerate(lines):
+            if reverse:
+                line, line_gain = compress_and_merge(line[::-1])
+                line = line[::-1]
+            else:
+                line, line_gain = compress_and_merge(line)
+            lines[k] = line
+            gained += line_gain
+        if direction in (0, 2):
+            return tuple(zip(*lines)), gained
+        return tuple(tuple(line) for line in lines), gained
+
+    @staticmethod
+    def board_empty_cells(board) -> list:
+        return [(i, j) for i, row in enumerate(board) for j, num in enumerate(row) if num == 0]
+
+    @staticmethod
+    def place_tile(board, i, j, value):
+        row = board[i]
+        return board[:i] + (row[:j] + (value,) + row[j+1:],) + board[i+1:]
+
+    @staticmethod
+    def board_game_over(board) -> bool:
+        rows, cols = len(board), len(board[0])
+        for i in range(rows):
+            for j in range(cols):
+                if board[i][j] == 0:
+                    return False
+                if j < cols - 1 and board[i][j] == board[i][j+1]:
+                    return False
+                if i < rows - 1 and board[i][j] == board[i+1][j]:
+                    return False
+        return True
+
+    @staticmethod
+    def board_grid(board):
+        return board
+
+    @staticmethod
+    def board_tiles(board) -> list:
+        return [num for row in board for num in row if num != 0]
+
+    # spawning
+
+    def spawn_range(self, board=None) -> tuple:
+        """(EASY_min, EASY_max) for a board: the smallest tile and half the
+        largest tile (at least 2)."""
+        tiles = self.board_tiles(self.state() if board is None else board)
+        if not tiles:
+            return 2, 2
+        high = max(max(tiles) // 2, 2)
+        return min(min(tiles), high), high
+
+    def spawn_outcomes(self, board, spawn_range=None) -> list:
+        """(value, probability) of every tile that can spawn on a board.
+        In easy mode move() fixes the range before sliding, so pass that
+        range when board is the board after a slide."""
+        if not self.easy:
+            return [(2, 0.9), (4, 0.1)]
+        low, high = spawn_range or self.spawn_range(board)
+        values = [2 ** k for k in range(int(math.log2(low)), int(math.log2(high)) + 1)]
+        return [(value, 1 / len(values)) for value in values]
+
+    def spawn_value(self, spawn_range) -> int:
+        if self.easy:
+            low, high = spawn_range
+            return 2 ** self.rng.randint(int(math.log2(low)), int(math.log2(high)))
+        return 2 if self.rng.random() < 0.9 else 4
+
+    def add_tile(self, spawn_range=None):
+        """Chance event: spawn a tile in a random blank cell.
+        Returns the (i, j, value) that was spawned, or None if the board is full."""
+        board = self.state()
+        blanks = self.board_empty_cells(board)
+        if not blanks:
+            return None
+        i, j = self.rng.choice(blanks)
+        value = self.spawn_value(spawn_range or self.spawn_range(board))
+        self.set_state(self.place_tile(board, i, j, value))
+        return i, j, value
+
+    # moves
+
+    def slide_move(self, direction) -> bool:
+        """Player half of a move: slide and merge, but don't spawn."""
+        board = self.state()
+        new_board, gained = self.slide_board(board, direction)
+        if new_board == board:
+            return False
+        self.set_state(new_board)
+        self.score += gained
+        self.moves += 1
+        return True
+
+    def move(self, direction) -> bool:
+        """Play a move and spawn a tile if the board changed."""
+        # Easy-mode spawns use the range from before the move, like the TUI
+        spawn_range = self.spawn_range() if self.easy else None
+        moved = self.slide_move(direction)
+        if moved:
+            spawn = self.add_tile(spawn_range)
+            if self.recorder is not None:
+                self.recorder.record(self, direction, spawn)
+        return moved
+
+    # game state
+
+    def empty_cells(self) -> list:
+        return self.board_empty_cells(self.state())
+
+    def is_game_over(self) -> bool:
+        return self.board_game_over(self.state())
+
+    def has_won(self) -> bool:
+        return self.get_max_tile() >= WIN_TILE
+
+    def is_finished(self) -> bool:
+        """Game over, or won while not in unlimited mode."""
+        return self.is_game_over() or (self.has_won() and not self.unlimited)
+
+    def get_max_tile(self) -> int:
+        return max(self.board_tiles(self.state()), default=0)
+
+    def display(self) -> None:
+        print("Score:", self.score)
+        for row in self.board_grid(self.state()):
+            print(" ".join(str(x).rjust(5) for x in row))
+        print()
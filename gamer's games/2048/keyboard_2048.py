@@ -0,0 +1,81 @@
+# 2048 raw keyboard input
+# Reads single keypresses (letters and arrow keys) without waiting for Enter.
+# Only available on terminals with termios; everywhere else the TUI keeps
+# reading whole lines.
+
+import os
+import select
+import sys
+
+try:
+    import termios
+    import tty
+except ImportError:  # Windows
+    termios = None
+
+# Arrow keys arrive as escape sequences; both the normal and the
+# application cursor mode forms map to the WASD commands
+ARROW_KEYS = {
+    '\033[A': 'W', '\033OA': 'W',
+    '\033[C': 'D', '\033OC': 'D',
+    '\033[B': 'S', '\033OB': 'S',
+    '\033[D': 'A', '\033OD': 'A',
+}
+IGNORED_KEYS = '\r\n '
+
+
+def decode_keys(text) -> list:
+    """Turn raw terminal input into a list of one-letter commands."""
+    commands = []
+    i = 0
+    while i < len(text):
+        sequence = text[i:i + 3]
+        if sequence in ARROW_KEYS:
+            commands.append(ARROW_KEYS[sequence])
+            i += 3
+            continue
+        if text[i] == '\033':
+            # Unknown escape sequence (or a bare Esc): skip its letters too
+            i += 1
+            if i < len(text) and text[i] in '[O':
+                i += 1
+                while i < len(text) and not text[i].isalpha() and text[i] != '~':
+                    i += 1
+                i += 1
+            continue
+        if text[i] not in IGNORED_KEYS:
+            commands.append(text[i].upper())
+        i += 1
+    return commands
+
+
+class RawKeyboard:
+    """cbreak-mode keyboard on stdin.
+
+    read_keys() blocks until a key is pressed and then also takes every key
+    that is already queued, so keys typed while the board was being drawn
+    are applied together instead of one redraw each. The terminal is only
+    in cbreak mode while reading, so the line-based prompts keep working.
+    """
+
+    def __init__(self, stream=sys.stdin):
+        self.fd = stream.fileno()
+        self.available = termios is not None and os.isatty(self.fd)
+
+    def read_keys(self):
+        """Commands for the pressed keys, or None at end of input."""
+        old_attributes = termios.tcgetattr(self.fd)
+        try:
+            # TCSANOW: flushing here would throw away keys typed ahead
+            tty.setcbreak(self.fd, termios.TCSANOW)
+            data = os.read(self.fd, 1024)
+            if not data:
+                return None
+            while select.select([self.fd], [], [], 0)[0]:
+                more = os.read(self.fd, 1024)
+                if not more:
+                    break
+                data += more
+        finally:
+            termios.tcsetattr(self.fd, termios.TCSANOW, old_attributes)
+        return decode_keys(data.decode(errors='ignore'))
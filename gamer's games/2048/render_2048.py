@@ -0,0 +1,124 @@
+# 2048 terminal renderer
+# Keeps the last frame that was drawn and only rewrites what changed, using
+# ANSI cursor movement instead of clearing the whole screen.
+
+import sys
+
+# ANSI background (bg) and foreground (fg) color codes
+TILE_COLOURS = {
+    0:     ('\033[48;5;250m', '\033[38;5;240m'),  # Light gray bg, dark text
+    2:     ('\033[48;5;245m', '\033[38;5;15m'),   # Gray bg, **white text**
+    4:     ('\033[48;5;131m', '\033[38;5;15m'),   # Maroon bg
+    8:     ('\033[48;5;196m', '\033[38;5;15m'),   # Red
+    16:    ('\033[48;5;202m', '\033[38;5;15m'),   # Orange
+    32:    ('\033[48;5;226m', '\033[38;5;0m'),    # Yellow (black text)
+    64:    ('\033[48;5;220m', '\033[38;5;0m'),    # Gold
+    128:   ('\033[48;5;154m', '\033[38;5;0m'),    # Lime
+    256:   ('\033[48;5;34m',  '\033[38;5;15m'),   # Green
+    512:   ('\033[48;5;51m',  '\033[38;5;0m'),    # Cyan
+    1024:  ('\033[48;5;33m',  '\033[38;5;15m'),   # Blue
+    2048:  ('\033[48;5;20m',  '\033[38;5;15m'),
+    4096:  ('\033[48;5;127m', '\033[38;5;15m'),   # Purple
+    8192:  ('\033[38;5;52m',  '\033[38;5;15m')
+}
+FALLBACK_COLOURS = ('\033[48;5;235m', '\033[38;5;15m')
+RESET = '\033[0m'
+
+# Tiles too wide for the 4-character cell are shortened with a unit,
+# e.g. 16384 -> "16K", 33554432 -> "33M"; past the last unit they are shown
+# as powers of two ("2^62"), which big boards in unlimited mode can reach
+TILE_UNITS = ["", "K", "M", "B", "T", "Q"]
+
+TILE_WIDTH = 6  # "[xxxx]"
+
+
+def tile_label(num) -> str:
+    text = str(num)
+    if len(text) <= 4:
+        return text
+    unit = (len(text) - 1) // 3
+    if unit < len(TILE_UNITS):
+        return f"{num // 1000 ** unit}{TILE_UNITS[unit]}"
+    return f"2^{num.bit_length() - 1}"
+
+
+class TileStrings(dict):
+    """Tile value -> the string drawn for it. A string is built the first
+    time its tile shows up, so any tile on any board size has one."""
+
+    def __init__(self, coloured):
+        super().__init__()
+        self.coloured = coloured
+
+    def __missing__(self, num):
+        if self.coloured:
+            bg, fg = TILE_COLOURS.get(num, FALLBACK_COLOURS)
+            text = f"{bg}{fg}[{tile_label(num).rjust(4)}]{RESET}"
+        else:
+            text = f"[{str(num).rjust(4)}]"
+        self[num] = text
+        return text
+
+
+COLOURED_TILES = TileStrings(coloured=True)
+PLAIN_TILES = TileStrings(coloured=False)
+
+
+def visible_width(text) -> int:
+    """Printed width of a string, ignoring ANSI escape sequences."""
+    width = 0
+    in_escape = False
+    for ch in text:
+        if in_escape:
+            in_escape = not ch.isalpha()
+        elif ch == '\033':
+            in_escape = True
+        else:
+            width += 1
+    return width
+
+
+class FrameRenderer:
+    """Draws frames made of lines, where each line is a list of segments
+    (strings). Segments that are unchanged since the last frame are
+    skipped; changed ones are rewritten in place after moving the cursor.
+    """
+
+    def __init__(self, out=sys.stdout):
+        self.out = out
+        self.previous = None
+
+    def invalidate(self) -> None:
+        """Forget the last frame (something else drew on the screen)."""
+        self.previous = None
+
+    def render(self, lines, cursor=None, always=()) -> None:
+        """Draw a frame. cursor is the (row, column) to leave the cursor
+        at, and rows listed in always are redrawn even if unchanged (for
+        lines the user's typing may have overwritten)."""
+        parts = []
+        previous = self.previous
+        if previous is None:
+            parts.append('\033[H\033[2J')
+        for row, segments in enumerate(lines):
+            old = previous[row] if previous is not None and row < len(previous) else None
+            if old is None or len(old) != len(segments) or row in always:
+                # New or restructured line: rewrite all of it
+                parts.append(f'\033[{row + 1};1H' + ''.join(segments) + '\033[K')
+                continue
+            column = 1
+            for new_segment, old_segment in zip(segments, old):
+                if new_segment != old_segment:
+                    parts.append(f'\033[{row + 1};{column}H' + new_segment)
+                    if visible_width(new_segment) < visible_width(old_segment):
+                        parts.append('\033[K')
+                column += visible_width(new_segment)
+        if previous is not None:
+            # Blank out lines the new frame no longer has
+            for row in range(len(lines), len(previous)):
+                parts.append(f'\033[{row + 1};1H\033[K')
+        if cursor is not None:
+            parts.append(f'\033[{cursor[0] + 1};{cursor[1] + 1}H')
+        self.out.write(''.join(parts))
+        self.out.flush()
+        self.previous = [list(segments) for segments in lines]
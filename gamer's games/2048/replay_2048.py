@@ -0,0 +1,178 @@
+# 2048 replay files
+# A compact binary record of one game: the seed, every move as 2 bits and
+# every spawned tile, plus a full board every KEYFRAME_INTERVAL moves so a
+# replay can jump to any move by sliding at most that many times.
+#
+# Layout (little-endian):
+#   header     magic, version, flags, keyframe interval, seed, number of moves
+#   moves      4 moves per byte, move k in bits 2*(k%4)..2*(k%4)+1,
+#              padded to a multiple of 8 bytes
+#   spawns     one uint16 per move: cell (4*i + j) in the low 4 bits,
+#              log2 of the tile above them
+#   keyframes  for moves 0, K, 2K, ...: 16 uint8 log2 tiles + uint64 score
+#
+# Usage:
+#   python replay_2048.py last_game.2048_replay --move 500
+
+import argparse
+import mmap
+import struct
+
+from engine_2048 import Game2048, atomic_write
+
+MAGIC = b'2RPL'
+VERSION = 1
+HEADER = struct.Struct('<4sBBHqI')
+SPAWN = struct.Struct('<H')
+KEYFRAME = struct.Struct('<16BQ')
+KEYFRAME_INTERVAL = 64
+
+FLAG_EASY = 1
+FLAG_UNLIMITED = 2
+FLAG_SEEDED = 4
+
+MOVE_NAMES = ['up', 'right', 'down', 'left']
+
+
+def _exponents(grid) -> list:
+    return [num.bit_length() - 1 if num else 0 for row in grid for num in row]
+
+
+def _grid(exponents) -> tuple:
+    return tuple(tuple(1 << e if e else 0 for e in exponents[4*i:4*i + 4]) for i in range(4))
+
+
+def _padded(length) -> int:
+    return (length + 7) // 8 * 8
+
+
+class ReplayRecorder:
+    """Records the game it is attached to, starting from its current board.
+
+    recorder = ReplayRecorder(game)
+    ... play through game.move() ...
+    recorder.save(path)
+
+    Only 4x4 games fit the format (spawn cells and keyframes are 16 cells).
+    """
+
+    def __init__(self, game, keyframe_interval=KEYFRAME_INTERVAL):
+        if (game.rows, game.cols) != (4, 4):
+            raise ValueError(f"Replays only support 4x4 boards, not {game.rows}x{game.cols}")
+        self.seed = game.seed
+        self.easy = game.easy
+        self.unlimited = game.unlimited
+        self.keyframe_interval = keyframe_interval
+        self.moves = bytearray()
+        self.spawns = bytearray()
+        self.keyframes = bytearray()
+        self.count = 0
+        self._keyframe(game)
+        game.recorder = self
+
+    def _keyframe(self, game) -> None:
+        grid = game.board_grid(game.state())
+        self.keyframes += KEYFRAME.pack(*_exponents(grid), game.score)
+
+    def record(self, game, direction, spawn) -> None:
+        """Called by Game2048.move after a move that changed the board."""
+        if self.count % 4 == 0:
+            self.moves.append(0)
+        self.moves[-1] |= direction << (2 * (self.count % 4))
+        i, j, value = spawn
+        self.spawns += SPAWN.pack((4*i + j) | ((value.bit_length() - 1) << 4))
+        self.count += 1
+        if self.count % self.keyframe_interval == 0:
+            self._keyframe(game)
+
+    def to_bytes(self) -> bytes:
+        flags = ((FLAG_EASY if self.easy else 0) |
+                 (FLAG_UNLIMITED if self.unlimited else 0) |
+                 (FLAG_SEEDED if self.seed is not None else 0))
+        header = HEADER.pack(MAGIC, VERSION, flags, self.keyframe_interval,
+                             self.seed or 0, self.count)
+        moves = bytes(self.moves).ljust(_padded(len(self.moves)), b'\0')
+        return header + moves + bytes(self.spawns) + bytes(self.keyframes)
+
+    def save(self, path) -> None:
+        data = self.to_bytes()
+        atomic_write(path, lambda f: f.write(data))
+
+
+class Replay:
+    """A recorded game, memory-mapped from disk (or read from bytes).
+
+    board_at(n) is the board before move n (board_at(len(replay)) is the
+    final board); move(n) is the move that was played from it.
+    """
+
+    def __init__(self, data):
+        self.data = memoryview(data)
+        magic, version, flags, self.keyframe_interval, seed, self.count = HEADER.unpack_from(self.data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("not a 2048 replay (or an unsupported version)")
+        self.seed = seed if flags & FLAG_SEEDED else None
+        self.easy = bool(flags & FLAG_EASY)
+        self.unlimited = bool(flags & FLAG_UNLIMITED)
+        self.moves_offset = HEADER.size
+        self.spawns_offset = self.moves_offset + _padded((self.count + 3) // 4)
+        self.keyframes_offset = self.spawns_offset + SPAWN.size * self.count
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def move(self, n) -> int:
+        return (self.data[self.moves_offset + n // 4] >> (2 * (n % 4))) & 3
+
+    def spawn(self, n) -> tuple:
+        """(i, j, value) of the tile spawned after move n."""
+        packed, = SPAWN.unpack_from(self.data, self.spawns_offset + SPAWN.size * n)
+        i, j = divmod(packed & 0xF, 4)
+        return i, j, 1 << (packed >> 4)
+
+    def board_at(self, n) -> tuple:
+        """(board, score) before move n, as a tuple of row tuples."""
+        if not 0 <= n <= self.count:
+            raise IndexError(f"move {n} is outside 0..{self.count}")
+        k = n // self.keyframe_interval
+        *exponents, score = KEYFRAME.unpack_from(self.data, self.keyframes_offset + KEYFRAME.size * k)
+        board = _grid(exponents)
+        for m in range(k * self.keyframe_interval, n):
+            board, gained = Game2048.slide_board(board, self.move(m))
+            score += gained
+            board = Game2048.place_tile(board, *self.spawn(m))
+        return board, score
+
+    def game_at(self, n, game_class=Game2048) -> Game2048:
+        """A game (of a tuple-board class) positioned before move n, e.g. to
+        ask a player what it would play there. Its own random spawns won't
+        follow the replay."""
+        game = game_class(seed=self.seed, easy=self.easy, unlimited=self.unlimited)
+        board, game.score = self.board_at(n)
+        game.set_state(board)
+        game.moves = n
+        return game
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show a recorded 2048 game at a given move.")
+    parser.add_argument('path')
+    parser.add_argument('--move', type=int, default=None, help="move number (default: the end)")
+    args = parser.parse_args()
+
+    replay = Replay.load(args.path)
+    n = len(replay) if args.move is None else args.move
+    print(f"Seed: {replay.seed}, easy: {replay.easy}, moves: {len(replay)}")
+    print(f"Before move {n}:")
+    replay.game_at(n).display()
+    if n < len(replay):
+        print("Played:", MOVE_NAMES[replay.move(n)], "then spawned", replay.spawn(n))
+
+
+if __name__ == "__main__":
+    main()
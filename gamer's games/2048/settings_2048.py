@@ -0,0 +1,74 @@
+# 2048 settings store
+# settings.2048_settings holds a Python dict literal of on/off flags, e.g.
+#   {"colours":True,"easy":True,"unlimited":False}
+# It is read and checked once at startup; after that the flags are plain
+# bool attributes, and every toggle writes the file back.
+
+import ast
+import os
+
+from engine_2048 import atomic_write
+
+SETTINGS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "settings.2048_settings")
+
+# Setting name -> label on the settings screen, in display order
+SETTING_LABELS = {
+    "colours": "Colours",
+    "easy": "Easy mode",
+    "unlimited": "Unlimited mode",
+}
+DEFAULTS = {"colours": True, "easy": True, "unlimited": False}
+
+
+def parse_settings(text) -> dict:
+    """Validated flags from the file's text. Unknown names and values that
+    aren't True/False are ignored; missing flags keep their defaults."""
+    values = dict(DEFAULTS)
+    try:
+        loaded = ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        return values
+    if not isinstance(loaded, dict):
+        return values
+    for name, value in loaded.items():
+        if name in DEFAULTS and isinstance(value, bool):
+            values[name] = value
+    return values
+
+
+class Settings:
+    """The terminal game's settings as typed flags."""
+
+    def __init__(self, path=SETTINGS_PATH, colours=True, easy=True, unlimited=False):
+        self.path = path
+        self.colours = colours
+        self.easy = easy
+        self.unlimited = unlimited
+
+    @classmethod
+    def load(cls, path=SETTINGS_PATH):
+        """Read the settings file; defaults if it's missing or unreadable."""
+        try:
+            with open(path) as f:
+                text = f.read()
+        except OSError:
+            text = ""
+        return cls(path, **parse_settings(text))
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in SETTING_LABELS}
+
+    def save(self) -> None:
+        text = "{" + ",".join(f'"{name}":{value}' for name, value in self.as_dict().items()) + "}"
+        atomic_write(self.path, lambda f: f.write(text), "w")
+
+    def toggle(self, name) -> bool:
+        """Flip a flag and save. Returns the new value."""
+        value = not getattr(self, name)
+        setattr(self, name, value)
+        try:
+            self.save()
+        except OSError:
+            # Read-only install: keep the change for this session only
+            pass
+        return value
@@ -3,14 +3,32 @@
 
 import os
 import random
-import copy
-import math
+import sys
 
-cells = [[0,0,0,0],
-         [0,0,0,0],
-         [0,0,0,0],
-         [0,0,0,0]]
+from engine_2048 import DIRECTIONS, Game2048
+from keyboard_2048 import RawKeyboard
+from render_2048 import COLOURED_TILES, PLAIN_TILES, FrameRenderer
+from replay_2048 import ReplayRecorder
+from settings_2048 import SETTING_LABELS, Settings
+
+# Board size, e.g. "python terminal-engine.py 6x6" (4x4 by default)
+BOARD_SIZE = (4, 4)
+if len(sys.argv) > 1:
+    try:
+        BOARD_SIZE = tuple(int(n) for n in sys.argv[1].lower().split('x'))
+    except ValueError:
+        BOARD_SIZE = ()
+    if len(BOARD_SIZE) != 2 or min(BOARD_SIZE) < 2:
+        sys.exit(f"Board size should look like 6x6, not {sys.argv[1]}")
+# The board and the game rules live in the headless engine
+game = Game2048(rows=BOARD_SIZE[0], cols=BOARD_SIZE[1])
 previous = ' '
+# Redraws only the parts of the game screen that changed between moves
+renderer = FrameRenderer()
+# Single keypresses (arrow keys too) when stdin is a terminal
+keyboard = RawKeyboard()
+# The last finished game is saved here (see replay_2048.py)
+REPLAY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "last_game.2048_replay")
 
 _errors1 = [" Entered X                     ", " Command X is invalid          ", 
             " Move didn't change board      ", " Game over!                    ", 
@@ -24,27 +42,31 @@ _inputs1 = [" Enter a command: _            \b\b\b\b\b\b\b\b\b\b\b\b\b", " Press
 error_code = 0
 input_code = 0
 
-# settings
-settings = {
-    "colors": (True, "Colours"),
-    "easy": (True, "Easy mode"),
-    "unlimited": (False, "Unlimited mode")
-}
-
-num_to_settings = ["colors", "easy", "unlimited"]
+# settings, loaded once from settings.2048_settings
+settings = Settings.load()
 
-# easy mode variables
-EASY_min=2
-EASY_max=2
+num_to_settings = list(SETTING_LABELS)
+# Tile strings for the current colour setting, swapped when it's toggled
+tile_strings = COLOURED_TILES if settings.colours else PLAIN_TILES
 
 # basic terminal functions
 
 def clear_screen() -> None:
     """Clear the terminal screen."""
-    os.system('cls' if os.name == 'nt' else 'clear')
-
-def boards_equal(b1, b2) -> bool:
-    return all(b1[i] == b2[i] for i in range(4))
+    if os.name == 'nt':
+        os.system('cls')
+    else:
+        sys.stdout.write('\033[H\033[2J')
+        sys.stdout.flush()
+    # Whatever the renderer drew last is gone now
+    renderer.invalidate()
+
+def prompt_segment(prompt) -> tuple:
+    """Split a prompt that backspaces onto its '_' into the text to print
+    and the column the cursor should be left at."""
+    backspaces = prompt.count('\b')
+    text = prompt.replace('\b', '')
+    return text, len(text) - backspaces
 
 def error_message() -> str:
     global previous, error_code
@@ -71,50 +93,16 @@ def safe_input(x=None):
         quit_display()
 
 # game mechanics functions
-def pop_random() -> bool:
-    """Pop a random number into a random blank cell, and return True if successful."""
-    global cells
-    blanks = check_blanks()
-    if blanks:
-        i, j = random.choice(blanks)
-        if settings['easy']:
-            cells[i][j] = 2 ** random.randint(int(math.log2(EASY_min)), int(math.log2(EASY_max)))
-        else:
-            cells[i][j] = 2 if random.random() < 0.9 else 4
-        return True
-    return False
-
 def reset_game() -> None:
     """Reset the game to the initial state."""
-    global cells, previous, EASY_max, EASY_min
-    cells = [[0, 0, 0, 0] for _ in range(4)]
+    global game, previous
+    # A fresh seed per game, so its replay says which game it was
+    game = Game2048(seed=random.randrange(2**32), easy=settings.easy, unlimited=settings.unlimited,
+                    rows=BOARD_SIZE[0], cols=BOARD_SIZE[1])
+    # Replays only fit 4x4 boards
+    if BOARD_SIZE == (4, 4):
+        ReplayRecorder(game)
     previous = ' '
-    EASY_min=2
-    EASY_max=2
-    # pop_random()
-
-def compress_and_merge(line) -> list:
-    """Compresses non-zero values and merges adjacent equal numbers."""
-    line = [num for num in line if num != 0]
-    for i in range(len(line) - 1):
-        if line[i] == line[i + 1]:
-            line[i] *= 2
-            line[i + 1] = 0
-    line = [num for num in line if num != 0]
-    return line + [0] * (4 - len(line))
-
-def reset_min_max() -> None:
-    """Reset the EASY_min and EASY_max values based on current cells."""
-    global EASY_min, EASY_max, cells
-    _min=68719476736; _max=0
-    for i in cells:
-        for j in i:
-            if j==0: continue
-            _min=min(_min, j)
-            _max=max(_max, j)
-    _max = max(_max//2, 2)
-    EASY_max=_max
-    EASY_min=_min
 
 # quitting functions
 
@@ -159,36 +147,15 @@ def welcome_quit() -> None:
 
 # game state functions
 
-def check_won() -> bool:
-    """Check if the player has won."""
-    global cells
-    for row in cells:
-        if 2048 in row:
-            return True
-    return False
-
-def check_game_over() -> bool:
-    "Check if the game is over."
-    if check_blanks():
-        return False  # There are still empty spaces
-    for i in range(4):
-        for j in range(4):
-            if i < 3 and cells[i][j] == cells[i+1][j]:
-                return False
-            if j < 3 and cells[i][j] == cells[i][j+1]:
-                return False
-    return True
-
-def operation_possible(before) -> int:
+def operation_possible(moved) -> int:
     "Check if an operation is possible."
-    global previous, cells, error_code, input_code
-    if not boards_equal(before, cells):
-        pop_random()
+    global previous, error_code, input_code
+    if moved:
         error_code = 0
     else:
         error_code = 2
     # Always check game over, even if no tiles moved
-    if check_game_over():
+    if game.is_game_over():
         error_code = 3
         input_code = 1
         display()
@@ -196,81 +163,20 @@ def operation_possible(before) -> int:
     else:
         return 0
 
-def check_blanks() -> list:
-    '''Output the places where they are blank.'''
-    global cells
-    blanks = []
-    for i in range(4):
-        for j in range(4):
-            if cells[i][j] == 0:
-                blanks.append((i, j))
-    return blanks
-
 def num_to_unit(num) -> str:
     """
     Colour and format a number for display.
-    If settings 'colors' is off, return a plain string.
+    If settings 'colours' is off, return a plain string.
     """
-    global settings
-    # ANSI background (bg) and foreground (fg) color codes
-    colors = {
-        0:     ('\033[48;5;250m', '\033[38;5;240m'),  # Light gray bg, dark text
-        2:     ('\033[48;5;245m', '\033[38;5;15m'),   # Gray bg, **white text**
-        4:     ('\033[48;5;131m', '\033[38;5;15m'),   # Maroon bg
-        8:     ('\033[48;5;196m', '\033[38;5;15m'),   # Red
-        16:    ('\033[48;5;202m', '\033[38;5;15m'),   # Orange
-        32:    ('\033[48;5;226m', '\033[38;5;0m'),    # Yellow (black text)
-        64:    ('\033[48;5;220m', '\033[38;5;0m'),    # Gold
-        128:   ('\033[48;5;154m', '\033[38;5;0m'),    # Lime
-        256:   ('\033[48;5;34m',  '\033[38;5;15m'),   # Green
-        512:   ('\033[48;5;51m',  '\033[38;5;0m'),    # Cyan
-        1024:  ('\033[48;5;33m',  '\033[38;5;15m'),   # Blue
-        2048:  ('\033[48;5;20m',  '\033[38;5;15m'),
-        4096:  ('\033[48;5;127m', '\033[38;5;15m'),   # Purple
-        8192:  ('\033[38;5;52m',  '\033[38;5;15m')
-    }
-    if not settings['colors']:
-        return f"[{str(num).rjust(4)}]"
-    bg, fg = colors.get(num, ('\033[48;5;235m', '\033[38;5;15m'))  # fallback
-    reset = '\033[0m'
-    if num>10000:
-        num = {
-            16384: "16K",
-            32768: "32K",
-            65536: "65K",
-            131072: "131K",
-            262144: "262K",
-            524288: "524K",
-            1048576: "1M",
-            2097152: "2M",
-            4194304: "4M",
-            8388608: "8M",
-            16777216: "16M",
-            33554422: "33M",
-            67108864: "67M",
-            134217728: "134M",
-            268435456: "268M",
-            536870912: "536M",
-            1073741824: "1B",
-            2147483648: "2B",
-            4294967296: "4B",
-            8589934592: "8B",
-            17179869184: "17B",
-            34359738368: "34B",
-            68719476736: "68B"
-        } [num]
-    return f"{bg}{fg}[{str(num).rjust(4)}]{reset}"
+    return tile_strings[num]
 
 # display functions
 
 def display() -> None:
     """Display the current state of the game."""
-    global cells, error_code, input_code, _inputs1, EASY_min, EASY_max
-    clear_screen()
-    print(f"---------- PLAY:{num_to_unit(2048)} ----------")
-    print(" ------------------------------- ")
-    if settings['easy']:
-        #print(EASY_min, EASY_max)
+    global error_code, input_code, _inputs1
+    if game.easy:
+        EASY_min, EASY_max = game.spawn_range()
         easy_list = [
             " MIN: ",
             num_to_unit(EASY_min),
@@ -279,14 +185,20 @@ def display() -> None:
         ]
     else:
         easy_list = ["    " for i in range(4)]
-    for i in range(4):
-        row = cells[i]
-        print(' '+''.join(num_to_unit(num) for num in row)+'|'+easy_list[i]+' ')
+    # Boards taller than 4 rows get nothing next to the extra rows
+    easy_list += [""] * (game.rows - len(easy_list))
     if (error_code == 4 or error_code == 3):
         input_code = 1
-    print()
-    print(error_message())
-    print(_inputs1[input_code], end='', flush=True)
+    prompt, cursor_column = prompt_segment(_inputs1[input_code])
+    lines = [
+        [f"---------- PLAY:{num_to_unit(2048)} ----------"],
+        [" ------------------------------- "],
+    ]
+    for i, row in enumerate(game.grid):
+        lines.append([' '] + [num_to_unit(num) for num in row] + ['|', easy_list[i], ' '])
+    lines += [[''], [error_message()], [prompt]]
+    # The prompt line is always redrawn because typed commands echo onto it
+    renderer.render(lines, cursor=(len(lines) - 1, cursor_column), always=(len(lines) - 1,))
 
 def display_rules() -> None:
     '''Display the rules of the game.'''
@@ -328,113 +240,101 @@ def home() -> None:
 
 def set_settings() -> None:
     "GUI for Settings"
-    global settings
+    global tile_strings
     selected=0
     _inp = ""
     select_icon = lambda x: "<-" if x==selected else "  "
     def show_setting(x: int):
         setting_key = num_to_settings[x]
-        item = settings[setting_key][1]
+        item = SETTING_LABELS[setting_key]
         whitespace = (16-len(item)) * ' '
-        return "  "+item+": "+on_off(settings[setting_key][0])+whitespace+select_icon(x)
+        return "  "+item+": "+on_off(getattr(settings, setting_key))+whitespace+select_icon(x)
     while _inp!='C':
         clear_screen()
         #print(" ------------------------------- ")
         print(f"-------- SETTINGS:{num_to_unit(2048)} --------")
         print(" ------------------------------- ")
-        print(show_setting((selected + len(settings) - 1) % len(settings)))
+        print(show_setting((selected + len(num_to_settings) - 1) % len(num_to_settings)))
         print(show_setting(selected))
-        print(show_setting((selected + 1) % len(settings)))
+        print(show_setting((selected + 1) % len(num_to_settings)))
         print(" S to scroll, T to toggle,       \n" \
               " C to confirm                    ")
         print()
         cmd = safe_input(" Enter a command...              "+"\b"*8).strip().upper()
         if cmd=="S":
-            selected = (selected + 1) % len(settings)
+            selected = (selected + 1) % len(num_to_settings)
         elif cmd=="T":
-            setting_key = num_to_settings[selected]
-            settings[setting_key] = tuple([not settings[setting_key][0], settings[setting_key][1]])
+            settings.toggle(num_to_settings[selected])
+            tile_strings = COLOURED_TILES if settings.colours else PLAIN_TILES
         elif cmd=="C":
             _inp = 'C'
             
 # in-game loop
 
+def read_commands() -> list:
+    """Commands entered since the last screen: every queued keypress in raw
+    keyboard mode, otherwise one line of input."""
+    if keyboard.available:
+        # Ctrl-C quits like it does at the line prompt (safe_input)
+        try:
+            commands = keyboard.read_keys()
+        except KeyboardInterrupt:
+            commands = None
+        if commands is None:
+            quit_display()
+        return commands
+    command = safe_input().strip().upper()
+    if command:
+        n = command[0]
+        status=True
+        for i in command:
+            if i != n:
+                command = '?'
+                status=False
+        if status: command = n
+    return [command]
+
+def play_command(command) -> int:
+    """Apply one command. Returns 1 if the game ended."""
+    global previous, error_code, input_code
+    if command in DIRECTIONS:
+        previous = command
+        if operation_possible(game.move(DIRECTIONS[command])):
+            return 1
+    elif command == 'E':
+        quit_confirm(1)
+        error_code = 0
+        return 0
+    elif command == 'I':
+        display_rules()
+        error_code = 0
+        return 0
+    else:
+        previous = command
+        error_code = 1
+        return 0
+    if game.has_won() and not game.unlimited:
+        error_code = 4
+        input_code = 1
+        display()
+        return 1
+    return 0
+
 def main() -> int:
     """Main game loop."""
-    global previous, cells, error_code, input_code, settings
+    global previous, error_code, input_code
     input_code = 0
     error_code = 0
-    pop_random()  # Start with a random number
     while True:
-        reset_min_max()
         display()
-        command = safe_input().strip().upper()
-        
-        if command:
-            n = command[0]
-            status=True
-            for i in command:
-                if i != n:
-                    command = '?'
-                    status=False
-            if status: command = n
-
-        if command == 'W':
-            previous = 'W'
-            before = copy.deepcopy(cells)
-
-            column_based_cells = [[cells[j][i] for j in range(4)] for i in range(4)]
-            for i in range(4):
-                new_col = compress_and_merge(column_based_cells[i])
-                for j in range(4):
-                    column_based_cells[i][j] = new_col[j]
-            cells = [[column_based_cells[j][i] for j in range(4)] for i in range(4)]
-            if operation_possible(before):
-                return 1
-        elif command == 'S':
-            previous = 'S'
-            before = copy.deepcopy(cells)
-            column_based_cells = [[cells[j][i] for j in range(4)] for i in range(4)]
-            for i in range(4):
-                reversed_col = column_based_cells[i][::-1]
-                new_col = compress_and_merge(reversed_col)
-                column_based_cells[i] = new_col[::-1]
-            cells = [[column_based_cells[j][i] for j in range(4)] for i in range(4)]
-            if operation_possible(before):
+        # Queued keypresses are all applied before the next redraw, so
+        # fast typing never leaves the board lagging behind
+        for command in read_commands():
+            if play_command(command):
                 return 1
-        elif command == 'A':
-            previous = 'A'
-            before = copy.deepcopy(cells)
-            for i in range(4):
-                cells[i] = compress_and_merge(cells[i])
-            if operation_possible(before):
-                return 1
-        elif command == 'D':
-            previous = 'D'
-            before = copy.deepcopy(cells)
-            for i in range(4):
-                reversed_row = cells[i][::-1]
-                new_row = compress_and_merge(reversed_row)
-                cells[i] = new_row[::-1]
-            if operation_possible(before):
-                return 1
-        elif command == 'E':
-            quit_confirm(1)
-            error_code = 0
-            continue
-        elif command == 'I':
-            display_rules()
-            error_code = 0
-            continue
-        else:
-            previous = command
-            error_code = 1
-            continue
-        if check_won() and not settings['unlimited'][0]:
-            error_code = 4
-            input_code = 1
-            display()
-            return 1
+            if command in ('E', 'I'):
+                # Another screen was shown; drop the keys typed before it
+                break
 
 # program loop
 
@@ -446,6 +346,11 @@ if __name__ == "__main__":
             status = main()
             if status == 0:
                 break
+            if game.recorder is not None:
+                try:
+                    game.recorder.save(REPLAY_PATH)
+                except OSError:
+                    pass
             input_code = 1
             display()
             quit_choice = True
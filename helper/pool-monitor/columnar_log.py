@@ -0,0 +1,182 @@
+# columnar_log.py
+# Compact binary pool logs, one file per column:
+#   <stem>.time   int64  seconds since 1970-01-01 of the logged (local) time
+#   <stem>.value  uint16 the reading, 0 for ERR
+#   <stem>.valid  bitmap, bit i (little-endian bit order) set if row i is a
+#                 reading, clear if it was ERR
+# All little-endian with no header, so every column can be opened with
+# numpy.memmap and months of history load without parsing anything.
+# Columns are appended value/valid first and time last; a row only counts
+# once all three have it, so a reader never sees half an append.
+#
+# Convert old CSV logs with:
+#   python columnar_log.py old_logs/pool_log_*.csv
+# which writes old_logs/pool_log_20250817.time/.value/.valid and so on.
+# plotting.py opens the columnar log when there is no CSV of that name.
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from log_follower import parse_rows
+
+SUFFIXES = ('.time', '.value', '.valid')
+TIME_DTYPE = np.dtype('<i8')
+VALUE_DTYPE = np.dtype('<u2')
+
+
+class ColumnarLog:
+    """A columnar log. Has the same poll()/restarted/count/times/values/
+    frame() interface as log_follower.LogFollower, so it can be followed
+    while something appends to it."""
+
+    def __init__(self, stem):
+        self.stem = stem
+        self.count = 0
+        self.inode = None
+        self.restarted = False
+
+    @staticmethod
+    def exists(stem):
+        return all(os.path.exists(stem + suffix) for suffix in SUFFIXES)
+
+    def size(self):
+        """Number of complete rows on disk."""
+        if not self.exists(self.stem):
+            return 0
+        time_size, value_size, valid_size = (os.path.getsize(self.stem + suffix) for suffix in SUFFIXES)
+        return min(time_size // TIME_DTYPE.itemsize, value_size // VALUE_DTYPE.itemsize, valid_size * 8)
+
+    def columns(self, rows=None):
+        """Memory-mapped (seconds, values, valid) of the first rows (default:
+        all); valid is unpacked into a bool array."""
+        rows = self.size() if rows is None else rows
+        if rows == 0:
+            return np.zeros(0, TIME_DTYPE), np.zeros(0, VALUE_DTYPE), np.zeros(0, dtype=bool)
+        seconds = np.memmap(self.stem + '.time', dtype=TIME_DTYPE, mode='r', shape=(rows,))
+        values = np.memmap(self.stem + '.value', dtype=VALUE_DTYPE, mode='r', shape=(rows,))
+        bits = np.memmap(self.stem + '.valid', dtype=np.uint8, mode='r', shape=((rows + 7) // 8,))
+        valid = np.unpackbits(bits, count=rows, bitorder='little').view(bool)
+        return seconds, values, valid
+
+    def read(self, start=0, stop=None):
+        """Rows start..stop as (datetime64[s] times, float values with NaN
+        for ERR)."""
+        seconds, values, valid = self.columns(stop)
+        times = np.asarray(seconds[start:]).view('datetime64[s]')
+        values = np.where(valid[start:], values[start:], np.nan)
+        return times, values
+
+    def append(self, times, values):
+        """Append rows: datetime64 times and float values (NaN for ERR).
+        Readings must be whole numbers that fit in uint16."""
+        seconds = np.asarray(times).astype('datetime64[s]').astype(TIME_DTYPE)
+        values = np.asarray(values, dtype=float)
+        valid = ~np.isnan(values)
+        readings = values[valid]
+        if len(readings) and (readings.min() < 0 or readings.max() > np.iinfo(VALUE_DTYPE).max):
+            raise ValueError(f"Values must fit in uint16, got {readings.min():.0f}..{readings.max():.0f}")
+        if np.any(readings != np.rint(readings)):
+            raise ValueError("Values must be whole numbers (round them first)")
+        rows = self.size()
+        # Anything past the complete rows was left by a failed append: trim
+        # it, then write the new rows after the complete ones. Nothing is
+        # ever cut below the complete rows, so readers never see them shrink.
+        self._write(self.stem + '.value', rows * VALUE_DTYPE.itemsize,
+                    np.where(valid, values, 0).astype(VALUE_DTYPE).tobytes())
+        # A partly used last bitmap byte is rewritten in place with the new
+        # bits after the old ones (the old bits stay as they were)
+        start = rows // 8
+        kept = rows % 8
+        old = np.zeros(0, dtype=bool)
+        if kept:
+            with open(self.stem + '.valid', "rb") as f:
+                f.seek(start)
+                old = np.unpackbits(np.frombuffer(f.read(1), dtype=np.uint8), count=kept,
+                                    bitorder='little').view(bool)
+        self._write(self.stem + '.valid', start,
+                    np.packbits(np.concatenate((old, valid)), bitorder='little').tobytes(),
+                    keep=(rows + 7) // 8)
+        self._write(self.stem + '.time', rows * TIME_DTYPE.itemsize, seconds.tobytes())
+
+    @staticmethod
+    def _write(path, offset, data, keep=None):
+        # Write data at offset; a tail beyond keep bytes (default: offset)
+        # is trimmed first
+        keep = offset if keep is None else keep
+        with open(path, "ab"):
+            pass
+        with open(path, "r+b") as f:
+            if os.fstat(f.fileno()).st_size > keep:
+                f.truncate(keep)
+            f.seek(offset)
+            f.write(data)
+
+    # follower interface
+
+    def poll(self):
+        """Rows appended since the last poll, as (times, values)."""
+        self.restarted = False
+        empty = self.read(0, 0)
+        try:
+            st = os.stat(self.stem + '.time')
+        except FileNotFoundError:
+            return empty
+        # The time column is written last and only shrinks when the log is
+        # rewritten (convert_csv); the other columns can look short for a
+        # moment in the middle of an append, which is just waited out
+        if self.inode is not None and (st.st_ino != self.inode or st.st_size // TIME_DTYPE.itemsize < self.count):
+            self.count = 0
+            self.restarted = True
+        self.inode = st.st_ino
+        rows = self.size()
+        if rows <= self.count:
+            return empty
+        times, values = self.read(self.count, rows)
+        self.count = rows
+        return times, values
+
+    @property
+    def times(self):
+        return self.read(0, self.count)[0]
+
+    @property
+    def values(self):
+        return self.read(0, self.count)[1]
+
+    def frame(self):
+        times, values = self.read(0, self.count)
+        return pd.DataFrame({'timestamp': times, 'value': values})
+
+
+def convert_csv(csv_path, stem=None):
+    """Write a CSV pool log as a columnar log (replacing one that exists)
+    and return its ColumnarLog."""
+    stem = stem or os.path.splitext(csv_path)[0]
+    with open(csv_path, "rb") as f:
+        times, values = parse_rows(f.read())
+    # Compressed logs (compressor.py) hold bin means with decimals; the
+    # format keeps whole readings
+    values = np.rint(values)
+    order = np.argsort(times, kind='stable')
+    for suffix in SUFFIXES:
+        if os.path.exists(stem + suffix):
+            os.remove(stem + suffix)
+    log = ColumnarLog(stem)
+    log.append(times[order], values[order])
+    return log
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python columnar_log.py pool_log_*.csv")
+    for csv_path in sys.argv[1:]:
+        log = convert_csv(csv_path)
+        start = time.perf_counter()
+        times, values = log.read()
+        ms = (time.perf_counter() - start) * 1000
+        size = sum(os.path.getsize(log.stem + suffix) for suffix in SUFFIXES)
+        print(f"{csv_path}: {len(times)} rows, {os.path.getsize(csv_path)} -> {size} bytes, loads in {ms:.1f} ms")
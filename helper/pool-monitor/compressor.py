@@ -1,7 +1,38 @@
+import csv
 import os
 
+from log_follower import LogFollower
+from rollups import LEVEL_SECONDS, RollupTier
+
+# Writes a compressed copy of a pool log: one row per bin of the chosen
+# level (see rollups.LEVEL_SECONDS) with the mean, min and max of its
+# readings and how many there were. Bins with only ERR rows are written as
+# ERR, bins without rows are left out. plotting.py reads the result like
+# any other log.
+
 csv_file = "pool_log_"+input("Compress file: _________\b\b\b\b\b\b\b\b\b")+".csv"
 file_exists = os.path.exists(csv_file)
 if file_exists:
     level = int(input("Compress level: __\b"))
-    
\ No newline at end of file
+    if level not in LEVEL_SECONDS:
+        print(f"Compress level should be 1-{max(LEVEL_SECONDS)}, not {level}")
+    else:
+        follower = LogFollower(csv_file)
+        follower.poll()
+        tier = RollupTier(LEVEL_SECONDS[level])
+        tier.add(follower.times.astype('int64'), follower.values)
+        df = tier.frame()
+
+        out_file = csv_file[:-len(".csv")]+f"_c{level}.csv"
+        with open(out_file, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["timestamp", "value", "min", "max", "count", f"compress:{level}"])
+            for row in df.itertuples(index=False):
+                if row.count:
+                    writer.writerow([row.timestamp.strftime("%Y-%m-%d %H:%M:%S"), round(row.value, 2),
+                                     int(row.min), int(row.max), row.count])
+                else:
+                    writer.writerow([row.timestamp.strftime("%Y-%m-%d %H:%M:%S"), "ERR", "", "", 0])
+        print(f"{follower.count} rows -> {len(df)} rows in {out_file}")
+else:
+    print(f"{csv_file} doesn't exist")
@@ -0,0 +1,96 @@
+# dashboard.py
+# Live pool dashboard: the figure, its lines and the stats box are made once
+# and then updated in place, so a refresh only redraws what changed.
+#
+# The data artists are animated and drawn with blitting on top of a saved
+# background (axes, ticks, grid). The background is only redrawn when the
+# axis limits change, and the limits leave some room ahead of the latest
+# reading, so most refreshes are just a blit of the data.
+
+import matplotlib.dates as mdates
+import matplotlib.pyplot as plt
+import numpy as np
+
+from segments import make_collections, segment_arrays
+
+# Room left after the latest reading and around the values, as a share of
+# the shown range
+HEADROOM = 0.05
+
+
+class LiveDashboard:
+    def __init__(self, title="Live CPH Extension Users Over Time (Auto-Refresh)"):
+        self.fig, self.ax = plt.subplots(figsize=(16, 6))
+        ax = self.ax
+        ax.xaxis_date()
+        ax.set_title(title)
+        ax.set_xlabel("Timestamp")
+        ax.set_ylabel("Active Users")
+        ax.tick_params(axis='x', labelrotation=45)
+        ax.grid(True)
+
+        self.collections = make_collections()
+        for collection in self.collections:
+            collection.set_animated(True)
+            ax.add_collection(collection)
+        self.markers, = ax.plot([], [], linestyle='none', marker='o', markersize=3, color='blue',
+                                animated=True)
+        self.text = ax.text(0.02, 0.98, "", transform=ax.transAxes, verticalalignment='top',
+                            fontsize=10, bbox=dict(boxstyle='round', facecolor='white', alpha=0.8),
+                            animated=True)
+        self.artists = self.collections + (self.markers, self.text)
+        self.background = None
+        self.fig.canvas.mpl_connect('draw_event', self._on_draw)
+        self.fig.tight_layout()
+        plt.show(block=False)
+
+    def _on_draw(self, event):
+        # Full redraws (resizes, limit changes) leave the animated artists
+        # out; save what's under them and put them back on top
+        self.background = self.fig.canvas.copy_from_bbox(self.fig.bbox)
+        self._draw_artists()
+
+    def _draw_artists(self):
+        for artist in self.artists:
+            self.ax.draw_artist(artist)
+
+    def _limits(self, x, values):
+        # Only move the limits once the data leaves them
+        x_low, x_high = x[0], x[-1]
+        valid = values[~np.isnan(values)]
+        y_low, y_high = (valid.min(), valid.max()) if len(valid) else (0, 1)
+        old_x, old_y = self.ax.get_xlim(), self.ax.get_ylim()
+        changed = False
+        if x_low != old_x[0] or x_high > old_x[1]:
+            span = max(x_high - x_low, 1 / 1440)
+            self.ax.set_xlim(x_low, x_high + span * HEADROOM)
+            changed = True
+        if y_low < old_y[0] or y_high > old_y[1]:
+            margin = max(y_high - y_low, 1) * HEADROOM
+            self.ax.set_ylim(y_low - margin, y_high + margin)
+            changed = True
+        return changed
+
+    def update(self, times, values, segments, stats):
+        """Show new data: times/values of the plotted rows, their segments
+        (segments.split_segments) and the text for the stats box."""
+        x = mdates.date2num(times)
+        for collection, lines in zip(self.collections, segment_arrays(x, values, segments)):
+            collection.set_segments(lines)
+        self.markers.set_data(x, values)
+        self.text.set_text(stats)
+
+        canvas = self.fig.canvas
+        if len(x) and self._limits(x, values) or self.background is None:
+            # New ticks: redraw everything, _on_draw blits the data back
+            canvas.draw()
+        else:
+            canvas.restore_region(self.background)
+            self._draw_artists()
+            canvas.blit(self.fig.bbox)
+        canvas.flush_events()
+
+    def wait(self, seconds):
+        # Keeps the window responsive; unlike plt.pause it doesn't redraw
+        # the whole figure
+        self.fig.canvas.start_event_loop(seconds)
@@ -0,0 +1,122 @@
+# log_follower.py
+# Follows a pool_log_*.csv while watch_pool.py is still writing it.
+#
+# Instead of re-reading the whole file every refresh, the follower remembers
+# how far it has read (a byte offset) and only parses what was appended
+# since, so a refresh costs as much as the new rows, not the whole day.
+#
+# - A last line without its newline yet is left for the next poll.
+# - If the file is replaced or truncated (a clean restart, see the HOW-TO),
+#   everything read so far is dropped and the new file is read from the top.
+# - Rows that don't parse (the header, half-written junk) are skipped,
+#   like read_csv(on_bad_lines='skip') did. ERR and empty values become NaN.
+
+import io
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def parse_rows(data):
+    """Parse complete CSV lines (bytes) into (timestamps, values) arrays:
+    datetime64[s] and float64 with NaN for errors."""
+    df = pd.read_csv(io.BytesIO(data), header=None, names=['timestamp', 'value'], usecols=[0, 1],
+                     dtype=str, keep_default_na=False, on_bad_lines='skip')
+    times = pd.to_datetime(df['timestamp'], format=TIME_FORMAT, errors='coerce')
+    good = times.notna().to_numpy()
+    times = times.to_numpy()[good].astype('datetime64[s]')
+    values = pd.to_numeric(df['value'], errors='coerce').to_numpy(dtype=float)[good]
+    return times, values
+
+
+def file_compress_level(path):
+    """The level of a compressed log (compressor.py): from its
+    "compress:N" header field, or else from a name ending in _cN (a
+    columnar copy has no header). 0 for a raw log."""
+    try:
+        with open(path, "rb") as f:
+            header = f.readline().decode('utf-8', 'replace').strip().split(',')
+    except FileNotFoundError:
+        header = []
+    for field in header:
+        name, _, level = field.partition(':')
+        if name == 'compress' and level.isdigit():
+            return int(level)
+    match = re.search(r"_c(\d+)$", os.path.splitext(path)[0])
+    return int(match.group(1)) if match else 0
+
+
+class LogFollower:
+    def __init__(self, path):
+        self.path = path
+        self.restarted = False
+        self.reset()
+
+    def reset(self):
+        self.offset = 0
+        self.inode = None
+        self.count = 0
+        # Grown by doubling, so appending stays cheap
+        self._times = np.empty(1024, dtype='datetime64[s]')
+        self._values = np.empty(1024, dtype=float)
+
+    @property
+    def times(self):
+        return self._times[:self.count]
+
+    @property
+    def values(self):
+        return self._values[:self.count]
+
+    def frame(self):
+        """Everything read so far as a DataFrame (timestamp, value)."""
+        return pd.DataFrame({'timestamp': self.times, 'value': self.values})
+
+    def poll(self):
+        """Read the rows appended since the last poll and return them as
+        (timestamps, values). self.restarted tells whether the file was
+        replaced, in which case the earlier rows are gone."""
+        self.restarted = False
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return self._times[:0], self._values[:0]
+        if self.inode is not None and (st.st_ino != self.inode or st.st_size < self.offset):
+            self.reset()
+            self.restarted = True
+        self.inode = st.st_ino
+        if st.st_size == self.offset:
+            return self._times[:0], self._values[:0]
+
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            data = f.read(st.st_size - self.offset)
+        # Only complete lines; a partial one is read again next time
+        end = data.rfind(b"\n") + 1
+        if end == 0:
+            return self._times[:0], self._values[:0]
+        self.offset += end
+        times, values = parse_rows(data[:end])
+        self._append(times, values)
+        return times, values
+
+    def _append(self, times, values):
+        count = self.count + len(times)
+        if count > len(self._times):
+            size = max(count, 2 * len(self._times))
+            self._times = np.resize(self._times, size)
+            self._values = np.resize(self._values, size)
+        self._times[self.count:count] = times
+        self._values[self.count:count] = values
+        old = self.count
+        self.count = count
+        # The log is written in time order; if the clock jumped back, sort
+        # again so the plot still reads left to right
+        if len(times) and ((old and times[0] < self._times[old - 1]) or np.any(np.diff(times) < np.timedelta64(0))):
+            order = np.argsort(self._times[:count], kind='stable')
+            self._times[:count] = self._times[:count][order]
+            self._values[:count] = self._values[:count][order]
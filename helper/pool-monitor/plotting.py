@@ -1,120 +1,101 @@
 # plotting.py
 import matplotlib.pyplot as plt
+import numpy as np
+import os
 import pandas as pd
 import time
 
-def compress_data(df, level):
-    """
-    根据压缩等级对数据进行时间聚合
-    """
-    if level == 0:
-        return df  # 原始数据
-    # 定义每个等级对应的秒数
-    level_seconds = {
-        1: 10,
-        2: 15,
-        3: 30,
-        4: 60,
-        5: 300,   # 5 minutes
-        6: 600,   # 10 minutes
-        7: 900,   # 15 minutes
-        8: 1800   # 30 minutes
-    }
-    
-    if level not in level_seconds:
-        print(f"⚠️ 无效等级 {level}，使用原始数据")
-        return df
-    
-    seconds = level_seconds[level]
-    # 将时间戳设为索引，并按指定秒数重采样，取平均值
-    df_resampled = df.set_index('timestamp').resample(f'{seconds}S').mean().reset_index()
-    return df_resampled
-compress_level = int(input("Enter Compress Level (0-8): "))
+from columnar_log import ColumnarLog
+from dashboard import LiveDashboard
+from log_follower import LogFollower, file_compress_level
+from rollups import LEVEL_SECONDS, RollupStore
+from segments import draw_segments, split_segments
+
+def stats_text(df, segments):
+    """统计信息框的文字"""
+    total_points = len(df)
+    error_count = df['value'].isna().sum()
+    gap_count = len(segments.gaps)
+    latest_val = f"{df['value'].iloc[-1]:.0f}" if not pd.isna(df['value'].iloc[-1]) else "ERR"
+    latest_time = df['timestamp'].iloc[-1]
+    return f"Points: {total_points} | ERR: {error_count} | Gaps: {gap_count} | Latest: {latest_val} @ {latest_time.strftime('%H:%M:%S')}"
+
+# 压缩等级: 0为原始数据，1-8 见 rollups.LEVEL_SECONDS，A 按显示范围自动选择
+level_input = input("Enter Compress Level (0-8, A for auto): ").strip().upper()
+auto_level = level_input == 'A'
+compress_level = 0 if auto_level else int(level_input)
+if compress_level != 0 and compress_level not in LEVEL_SECONDS:
+    print(f"⚠️ 无效等级 {compress_level}，使用原始数据")
+    compress_level = 0
 csv_file = "pool_log_"+input(">>>")+".csv"
+# 实时模式: 图表只创建一次，之后原地更新，可以几秒刷新一次
+live_mode = input("Live mode? (y/N): ").strip().upper() == 'Y'
+refresh_seconds = 60
+if live_mode:
+    refresh_seconds = float(input("Refresh every (seconds, default 5): ") or 5)
+    dashboard = LiveDashboard()
+# 只读取上次之后新追加的行，而不是每次重新读取整个文件
+# 没有CSV但有转换好的二进制日志时（见 columnar_log.py），直接读取二进制日志
+if not os.path.exists(csv_file) and ColumnarLog.exists(csv_file[:-len(".csv")]):
+    follower = ColumnarLog(csv_file[:-len(".csv")])
+else:
+    follower = LogFollower(csv_file)
+# compressor.py 写出的日志本身已按区间聚合，断档阈值至少为该区间
+file_level = file_compress_level(csv_file)
+# 各压缩等级的聚合数据随新数据增量更新，不再每次重新重采样
+rollups = RollupStore()
 
 while True:
-    plt.close('all')
+    if not live_mode:
+        plt.close('all')
     
     try:
-        df = pd.read_csv(csv_file, on_bad_lines='skip')
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-        df['value'] = pd.to_numeric(df['value'], errors='coerce')
-        df = df.sort_values('timestamp').reset_index(drop=True)
-        df = compress_data(df, compress_level)
+        new_times, new_values = follower.poll()
+        if follower.restarted:
+            print("⚠️ CSV文件被替换，重新读取")
+            rollups.reset()
+        rollups.add(new_times, new_values)
+        if follower.count == 0:
+            raise ValueError("没有数据")
+        if auto_level:
+            compress_level = rollups.choose_level()
+        if compress_level == 0:
+            df = follower.frame()
+        else:
+            df = rollups.frame(compress_level)
     except Exception as e:
         print(f"⚠️ 读取CSV失败: {e}，等待重试...")
-        time.sleep(60)
+        if live_mode:
+            # 实时模式下不能用 sleep，否则窗口会卡住
+            dashboard.wait(refresh_seconds)
+        else:
+            time.sleep(refresh_seconds)
         continue
 
     print(f"✅ 最新数据: {df['timestamp'].iloc[-1]} -> {df['value'].iloc[-1]}")
 
-    # --- 分段逻辑（与之前相同） ---
-    max_interval = pd.Timedelta(seconds=15)
-    segments = []
-    gap_segments = []
-    error_segments = []
+    # --- 分段逻辑（向量化，见 segments.py） ---
+    times = df['timestamp'].to_numpy()
+    values = df['value'].to_numpy(dtype=float)
+    # 压缩后相邻点至少相隔一个区间，不算断档
+    max_interval = max(15, LEVEL_SECONDS.get(compress_level, 0), LEVEL_SECONDS.get(file_level, 0))
+    segments = split_segments(times, values, max_interval=np.timedelta64(max_interval, 's'))
 
-    start_idx = 0
-    for i in range(1, len(df)):
-        if df.loc[i, 'timestamp'] - df.loc[i-1, 'timestamp'] > max_interval:
-            segments.append(df.iloc[start_idx:i])
-            gap_segments.append(df.iloc[i-1:i+1])
-            start_idx = i
-    segments.append(df.iloc[start_idx:])
-
-    in_error = False
-    error_start = 0
-    for i in range(len(df)):
-        if pd.isna(df.loc[i, 'value']) and not in_error:
-            in_error = True
-            error_start = i
-        elif not pd.isna(df.loc[i, 'value']) and in_error:
-            in_error = False
-            error_segments.append(df.iloc[error_start:i])
-    if in_error:
-        error_segments.append(df.iloc[error_start:])
+    if live_mode:
+        # --- 原地更新并等待 ---
+        dashboard.update(times, values, segments, stats_text(df, segments))
+        dashboard.wait(refresh_seconds)
+        continue
 
     # --- 绘图 ---
     plt.figure(figsize=(16, 6))
-
-    for seg in segments:
-        plt.plot(seg['timestamp'], seg['value'], marker='o', markersize=3, linewidth=1, color='blue')
-    for gap in gap_segments:
-        plt.plot(gap['timestamp'], gap['value'], marker='o', markersize=3, linewidth=1, color='red')
-        # plt.plot(gap['timestamp'], gap['value'], marker='o', markersize=3, linewidth=1, color='blue')
-    for error in error_segments:
-        if len(error) > 0:
-            start_idx = error.index[0]
-            end_idx = error.index[-1]
-            prev_value = None
-            next_value = None
-            if start_idx > 0 and not pd.isna(df.loc[start_idx-1, 'value']):
-                prev_value = df.loc[start_idx-1, 'value']
-            if end_idx < len(df)-1 and not pd.isna(df.loc[end_idx+1, 'value']):
-                next_value = df.loc[end_idx+1, 'value']
-            if prev_value is not None and next_value is not None:
-                plt.plot([
-                    df.loc[start_idx-1, 'timestamp'],
-                    df.loc[start_idx, 'timestamp'],
-                    df.loc[end_idx, 'timestamp'],
-                    df.loc[end_idx+1, 'timestamp']
-                ], [
-                    prev_value,
-                    prev_value,
-                    next_value,
-                    next_value
-                ], color='yellow', linewidth=3, alpha=0.7, marker='o', markersize=3)
+    draw_segments(plt.gca(), times, values, segments)
 
     # --- 增强元素 ---
     # plt.axhline(y=1000, color='orange', linestyle='--', linewidth=2, label='Alert Threshold (1000)')
     
-    total_points = len(df)
-    error_count = df['value'].isna().sum()
-    gap_count = len(gap_segments)
-    latest_val = df['value'].iloc[-1] if not pd.isna(df['value'].iloc[-1]) else "ERR"
-    latest_time = df['timestamp'].iloc[-1]
     plt.text(0.02, 0.98, 
-             f"Points: {total_points} | ERR: {error_count} | Gaps: {gap_count} | Latest: {latest_val} @ {latest_time.strftime('%H:%M:%S')}",
+             stats_text(df, segments),
              transform=plt.gca().transAxes, 
              verticalalignment='top',
              fontsize=10, 
@@ -130,4 +111,4 @@ while True:
 
     # --- 刷新并等待 ---
     plt.draw()
-    plt.pause(60)
\ No newline at end of file
+    plt.pause(refresh_seconds)
\ No newline at end of file
@@ -0,0 +1,152 @@
+# rollups.py
+# Pre-aggregated pool log tiers, one per compress level.
+#
+# Every tier splits time into fixed bins (10 s up to 30 min) and keeps, per
+# bin, the number of rows, the number of readings (rows that weren't ERR)
+# and their sum, min and max. Samples are added as they arrive, so a tier
+# never has to be recomputed from the raw log; drawing a week at the 30 min
+# level only touches a few hundred bins.
+#
+# A bin with rows but no readings is an error (value NaN), a bin without
+# rows is a gap and is left out of frames.
+
+import numpy as np
+import pandas as pd
+
+# compress level -> bin width in seconds (level 0 is the raw log)
+LEVEL_SECONDS = {
+    1: 10,
+    2: 15,
+    3: 30,
+    4: 60,
+    5: 300,   # 5 minutes
+    6: 600,   # 10 minutes
+    7: 900,   # 15 minutes
+    8: 1800   # 30 minutes
+}
+
+# Auto level: the finest level that keeps the plot under this many points
+MAX_POINTS = 2000
+
+
+def epoch_seconds(times):
+    return np.asarray(times).astype('datetime64[s]').astype(np.int64)
+
+
+class RollupTier:
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.first = None  # bin number of bins[0]
+        self.rows = np.zeros(0, dtype=np.int64)
+        self.count = np.zeros(0, dtype=np.int64)
+        self.total = np.zeros(0, dtype=float)
+        self.low = np.zeros(0, dtype=float)
+        self.high = np.zeros(0, dtype=float)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _cover(self, first, last):
+        # Grow the arrays so bins first..last exist, doubling at the end so
+        # appending stays cheap
+        if self.first is None:
+            self.first = first
+        before = max(self.first - first, 0)
+        size = len(self.rows)
+        after = max(last - self.first + 1 - size, 0)
+        if after:
+            after = max(after, size)
+        if not before and not after:
+            return
+        pads = (before, after)
+        self.rows = np.pad(self.rows, pads)
+        self.count = np.pad(self.count, pads)
+        self.total = np.pad(self.total, pads)
+        self.low = np.pad(self.low, pads, constant_values=np.inf)
+        self.high = np.pad(self.high, pads, constant_values=-np.inf)
+        self.first -= before
+
+    def add(self, seconds, values):
+        """Add samples: epoch seconds (int64) and values (NaN for ERR)."""
+        if not len(seconds):
+            return
+        bins = seconds // self.seconds
+        self._cover(int(bins.min()), int(bins.max()))
+        index = bins - self.first
+        np.add.at(self.rows, index, 1)
+        valid = ~np.isnan(values)
+        index, values = index[valid], values[valid]
+        np.add.at(self.count, index, 1)
+        np.add.at(self.total, index, values)
+        np.minimum.at(self.low, index, values)
+        np.maximum.at(self.high, index, values)
+
+    def used(self):
+        """Index of the last bin with rows, plus one."""
+        filled = np.flatnonzero(self.rows)
+        return filled[-1] + 1 if len(filled) else 0
+
+    def frame(self, start=None, end=None):
+        """The bins with rows between two epoch seconds, as a DataFrame of
+        timestamp (bin start), value (mean), min, max and count."""
+        if self.first is None:
+            return pd.DataFrame({'timestamp': pd.to_datetime([]), 'value': [], 'min': [],
+                                 'max': [], 'count': []})
+        lo = 0 if start is None else max(start // self.seconds - self.first, 0)
+        hi = self.used() if end is None else min(end // self.seconds - self.first + 1, len(self))
+        keep = lo + np.flatnonzero(self.rows[lo:hi])
+        count = self.count[keep]
+        errors = count == 0
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = self.total[keep] / count
+        low, high = self.low[keep], self.high[keep]
+        low[errors] = np.nan
+        high[errors] = np.nan
+        times = ((self.first + keep) * self.seconds).astype('datetime64[s]')
+        return pd.DataFrame({'timestamp': times, 'value': mean, 'min': low, 'max': high, 'count': count})
+
+
+class RollupStore:
+    """All the tiers of one log, fed with the rows as they are read."""
+
+    def __init__(self, levels=LEVEL_SECONDS):
+        self.levels = dict(levels)
+        self.reset()
+
+    def reset(self):
+        self.tiers = {level: RollupTier(seconds) for level, seconds in self.levels.items()}
+        self.start = None
+        self.end = None
+        self.rows = 0
+
+    def add(self, times, values):
+        """Add rows: datetime64 times and float values (NaN for ERR)."""
+        if not len(times):
+            return
+        seconds = epoch_seconds(times)
+        values = np.asarray(values, dtype=float)
+        for tier in self.tiers.values():
+            tier.add(seconds, values)
+        low, high = int(seconds.min()), int(seconds.max())
+        self.start = low if self.start is None else min(self.start, low)
+        self.end = high if self.end is None else max(self.end, high)
+        self.rows += len(seconds)
+
+    def choose_level(self, start=None, end=None, max_points=MAX_POINTS):
+        """Finest level that shows start..end (epoch seconds, default:
+        everything) in at most max_points points; 0 if the raw rows fit."""
+        start = self.start if start is None else start
+        end = self.end if end is None else end
+        if start is None:
+            return 0
+        span = max(end - start, 1)
+        # Rows in view, assuming they're spread evenly over the log
+        if self.rows * min(span / max(self.end - self.start, 1), 1) <= max_points:
+            return 0
+        for level in sorted(self.tiers):
+            if span / self.tiers[level].seconds <= max_points:
+                return level
+        return max(self.tiers)
+
+    def frame(self, level, start=None, end=None):
+        return self.tiers[level].frame(start, end)
@@ -0,0 +1,92 @@
+# segments.py
+# Splits the pool log into the pieces plotting.py draws, without looping
+# over rows:
+#   good:   runs of readings with no ERR and no gap between neighbours (blue)
+#   gaps:   pairs of neighbouring rows further apart than max_interval (red)
+#   errors: runs of ERR rows with a reading on both sides, drawn as a step
+#           from the reading before to the reading after (yellow)
+# Every piece is an index range [start, stop) into the time/value arrays,
+# found with diff/cumsum run-length encoding, and each kind is drawn as a
+# single LineCollection.
+
+from collections import namedtuple
+
+import matplotlib.dates as mdates
+import numpy as np
+from matplotlib.collections import LineCollection
+
+Segments = namedtuple('Segments', ['good', 'gaps', 'errors'])
+
+
+def runs(mask):
+    """[start, stop) of every run of True in a boolean array, as an (n, 2)
+    int array."""
+    edges = np.diff(np.concatenate(([0], mask.view(np.int8), [0])))
+    return np.column_stack((np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)))
+
+
+def split_segments(times, values, max_interval=np.timedelta64(15, 's')):
+    """Find the good, gap and error segments of a sorted log."""
+    valid = ~np.isnan(values)
+    gap_after = np.diff(times) > max_interval
+
+    starts = np.flatnonzero(gap_after)
+    gaps = np.column_stack((starts, starts + 2))
+
+    # A good run breaks before row k if there is a gap before it, or either
+    # side is an error; cumsum turns the breaks into run ids
+    breaks = np.ones(len(values), dtype=bool)
+    breaks[1:] = gap_after | ~valid[1:] | ~valid[:-1]
+    run_id = np.cumsum(breaks)
+    first = np.flatnonzero(valid & breaks)
+    good = np.column_stack((first, first + np.bincount(run_id[valid])[run_id[first]]))
+
+    errors = runs(~valid)
+    # Only errors with a reading on both sides get a step
+    errors = errors[(errors[:, 0] > 0) & (errors[:, 1] < len(values))]
+    return Segments(good, gaps, errors)
+
+
+def segment_lines(x, values, ranges):
+    """One (points, 2) array per index range, for a LineCollection."""
+    points = np.column_stack((x, values))
+    return [points[start:stop] for start, stop in ranges]
+
+
+def error_steps(x, values, errors):
+    """(n, 4, 2) steps across error runs: the reading before, held until the
+    run starts, then the reading after from the run's end."""
+    before = errors[:, 0] - 1
+    after = errors[:, 1]
+    xs = np.column_stack((x[before], x[before + 1], x[after - 1], x[after]))
+    ys = np.column_stack((values[before], values[before], values[after], values[after]))
+    return np.stack((xs, ys), axis=-1)
+
+
+def segment_arrays(x, values, segments):
+    """Line data of the good, gap and error collections."""
+    return (segment_lines(x, values, segments.good),
+            segment_lines(x, values, segments.gaps),
+            error_steps(x, values, segments.errors))
+
+
+def make_collections():
+    """Empty good, gap and error collections in their colours."""
+    return (LineCollection([], colors='blue', linewidths=1),
+            LineCollection([], colors='red', linewidths=1),
+            LineCollection([], colors='yellow', linewidths=3, alpha=0.7))
+
+
+def draw_segments(ax, times, values, segments):
+    """Draw every segment on ax with one collection per kind; returns the
+    (good, gaps, errors) collections and the marker line."""
+    # Markers for every reading in one go (ERR rows are NaN and skipped);
+    # plotting them first also sets the axis up for dates
+    markers, = ax.plot(times, values, linestyle='none', marker='o', markersize=3, color='blue')
+    x = mdates.date2num(times)
+    collections = make_collections()
+    for collection, lines in zip(collections, segment_arrays(x, values, segments)):
+        collection.set_segments(lines)
+        ax.add_collection(collection)
+    ax.autoscale_view()
+    return collections + (markers,)